@@ -5,6 +5,7 @@ User-Agent strings, HTTP timeouts, content size limits, API URLs, chart
 defaults, specialist names, event types, research modes, and step statuses.
 """
 
+import sys
 from typing import Literal
 
 # ─── Module overview ───────────────────────────────────────────────
@@ -34,6 +35,41 @@ DEFAULT_HTTP_HEADERS = {
 DEFAULT_HTTP_TIMEOUT = 15       # For standard HTTP requests (url, youtube, scholar)
 DEFAULT_SEARCH_TIMEOUT = 30     # For search APIs that lack their own timeout parameter
 PARALLEL_SEARCH_TIMEOUT = 60    # Collective wall-clock limit for parallel_search
+HTTP_KEEPALIVE_TIMEOUT = 60     # Idle seconds before a pooled connection is closed
+PDF_EXTRACT_TIMEOUT = 30        # Max seconds for PDF text extraction in the worker pool
+
+# ---------------------------------------------------------------------------
+# Circuit breaker (external APIs)
+# ---------------------------------------------------------------------------
+CIRCUIT_FAILURE_THRESHOLD = 5   # Consecutive failed calls before a breaker opens
+CIRCUIT_RESET_TIMEOUT = 30      # Seconds an open breaker fails fast before probing again
+
+# Bulkheads: most requests in flight at once per rate-limited API
+WOLFRAM_MAX_CONCURRENCY = 4
+OPENWEATHER_MAX_CONCURRENCY = 8
+
+# ---------------------------------------------------------------------------
+# Connection pooling (shared aiohttp session)
+# ---------------------------------------------------------------------------
+HTTP_POOL_LIMIT_PER_HOST = 10   # Matches parallel_search's 10-search cap
+HTTP_STREAM_CHUNK_SIZE = 65536  # Bytes per read when streaming a response body
+HTML_MAX_BYTES = 512 * 1024     # fetch_url stops reading an HTML/text body after this much
+
+# False on a free-threaded CPython build (3.13t) running with PYTHON_GIL=0
+GIL_ENABLED = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+# Worker threads shared by every blocking library call (DDGS, wikipedia,
+# arxiv, ...). Sized above the 10-search cap so a few timed-out calls that
+# are still running can't starve a fresh parallel_search batch. Without a
+# GIL the threads also parse responses in parallel, so allow twice as many.
+BLOCKING_IO_MAX_WORKERS = 16 if GIL_ENABLED else 32
+
+# Worker processes for CPU-bound PDF text extraction (kept off the GIL)
+PDF_EXTRACT_WORKERS = 2
+
+# pypdf documents are split into page ranges of at least this many pages,
+# one range per pool task; shorter documents are extracted in one task
+PDF_PAGES_PER_TASK = 8
 
 # ---------------------------------------------------------------------------
 # Content size limits (characters)
@@ -66,7 +102,9 @@ PDF_MAX_PAGES = 20                  # Max PDF pages to extract
 # Chart rendering defaults (visualization_tool)
 # ---------------------------------------------------------------------------
 CHART_FIGSIZE = (10, 6)    # Width x height in inches
-CHART_DPI = 150             # Dots per inch — produces 1500x900 px images
+CHART_DPI = 100             # Dots per inch — produces 1000x600 px images
+CHART_MAX_DPI = 300         # Upper bound for a spec's "dpi" option
+CHART_FORMATS = ("png", "jpg", "webp")  # Output formats a spec may request
 
 # ---------------------------------------------------------------------------
 # Text truncation
@@ -87,6 +125,13 @@ WIKIDATA_SPARQL_URL = "https://query.wikidata.org/sparql"
 # Caching
 # ---------------------------------------------------------------------------
 DEFAULT_CACHE_TTL = 300  # Seconds before a cached result expires (5 minutes)
+SEARCH_CACHE_MAX_ENTRIES = 128          # Search results kept per process (per tool)
+PDF_CACHE_MAX_ENTRIES = 16              # Downloaded PDFs kept per process
+PDF_CACHE_MAX_BYTES = 5 * 1024 * 1024   # Larger PDFs are never cached
+URL_CACHE_MAX_ENTRIES = 64              # fetch_url pages kept per process
+URL_CACHE_MAX_AGE = 3600                # Seconds a stale page is kept for ETag/Last-Modified revalidation
+WEATHER_CACHE_TTL = 600                 # OpenWeatherMap refreshes its data about every 10 minutes
+REFERENCE_CACHE_TTL = 3600              # Wolfram Alpha / Wikipedia answers change rarely
 
 # ---------------------------------------------------------------------------
 # Specialist names (multi-agent orchestration)
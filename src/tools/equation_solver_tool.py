@@ -32,6 +32,15 @@ except ImportError:
 _KNOWN_FUNCTIONS = {'sin', 'cos', 'tan', 'log', 'exp', 'sqrt', 'abs',
                      'sinh', 'cosh', 'tanh', 'asin', 'acos', 'atan'}
 
+# Names that are never treated as free variables by _extract_variables
+_RESERVED_NAMES = frozenset({'sin', 'cos', 'tan', 'log', 'exp', 'sqrt', 'abs', 'pi', 'e'})
+
+# Preprocessing patterns, compiled once at import
+_DIGIT_LETTER_RE = re.compile(r'(\d)([a-zA-Z])')
+_PAREN_LETTER_RE = re.compile(r'\)([a-zA-Z])')
+_LETTER_PAREN_RE = re.compile(r'([a-zA-Z])\(')
+_SINGLE_LETTER_RE = re.compile(r'\b([a-zA-Z])\b')
+
 
 # Takes (equation_str). Converts ^ to ** and inserts implicit multiplication.
 # Returns the preprocessed string ready for SymPy parsing.
@@ -39,12 +48,11 @@ def _preprocess_equation(equation_str: str) -> str:
     """Convert ^ to ** and insert implicit multiplication for SymPy."""
     equation_str = equation_str.replace("^", "**")
     # 2x → 2*x
-    equation_str = re.sub(r'(\d)([a-zA-Z])', r'\1*\2', equation_str)
+    equation_str = _DIGIT_LETTER_RE.sub(r'\1*\2', equation_str)
     # )x → )*x
-    equation_str = re.sub(r'\)([a-zA-Z])', r')*\1', equation_str)
+    equation_str = _PAREN_LETTER_RE.sub(r')*\1', equation_str)
     # x( → x*( BUT skip known functions like sin(, cos(, etc.
-    equation_str = re.sub(
-        r'([a-zA-Z])\(',
+    equation_str = _LETTER_PAREN_RE.sub(
         lambda m: m.group(0) if _is_function_prefix(equation_str, m.start()) else m.group(1) + '*(',
         equation_str,
     )
@@ -67,15 +75,11 @@ def _is_function_prefix(s: str, pos: int) -> bool:
 # Returns a deduplicated list of variable characters.
 def _extract_variables(expression_str: str) -> List[str]:
     """Extract single-letter variable names, excluding reserved math names."""
-    reserved = {'sin', 'cos', 'tan', 'log', 'exp', 'sqrt', 'abs', 'pi', 'e'}
-    potential_vars = re.findall(r'\b([a-zA-Z])\b', expression_str)
-    variables = []
-    seen = set()
-    for var in potential_vars:
-        if var.lower() not in reserved and var not in seen:
-            variables.append(var)
-            seen.add(var)
-    return variables
+    # dict.fromkeys dedups while preserving first-seen order
+    return list(dict.fromkeys(
+        var for var in _SINGLE_LETTER_RE.findall(expression_str)
+        if var.lower() not in _RESERVED_NAMES
+    ))
 
 
 # Takes (expr_str, local_dict). Parses with implicit multiplication transforms.
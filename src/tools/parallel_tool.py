@@ -6,7 +6,10 @@ from typing import Dict, List, Literal, Type
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from src.constants import TRUNCATION_PRESERVE_RATIO
+from src.constants import (
+    TRUNCATION_PRESERVE_RATIO, DEFAULT_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES,
+)
+from src.utils import TTLCache
 from src.tools.search_tool import web_search
 from src.tools.wikipedia_tool import wikipedia
 from src.tools.news_tool import news_search
@@ -22,6 +25,9 @@ from src.tools.arxiv_tool import arxiv_search
 # Timeout for the entire parallel operation (seconds)
 PARALLEL_TIMEOUT = 60
 
+# Successful results by (type, query); agents often re-issue the same search
+_cache = TTLCache(ttl=DEFAULT_CACHE_TTL, maxsize=SEARCH_CACHE_MAX_ENTRIES)
+
 # Result truncation limits by type
 TRUNCATION_LIMITS = {
     "web": 600,
@@ -54,41 +60,51 @@ def truncate_result(result: str, search_type: str) -> str:
     if len(result) <= limit:
         return result
 
-    truncated = result[:limit]
-    last_period = truncated.rfind('.')
-    last_newline = truncated.rfind('\n')
-
-    cut_point = max(last_period, last_newline)
+    # Only a sentence/line boundary that preserves at least 70% of the target
+    # length is worth using; otherwise a hard cut loses less useful content.
+    # So both scans are confined to that tail window of result[:limit].
+    floor = int(limit * TRUNCATION_PRESERVE_RATIO) + 1
+    cut_point = max(result.rfind('.', floor, limit), result.rfind('\n', floor, limit))
 
-    # Only use the sentence/line boundary if it preserves at least 70% of
-    # the target length; otherwise a hard cut loses less useful content.
-    if cut_point > limit * TRUNCATION_PRESERVE_RATIO:
-        truncated = result[:cut_point + 1]
-    else:
-        truncated = result[:limit]
+    end = cut_point + 1 if cut_point != -1 else limit
 
-    return truncated + "..."
+    return f"{result[:end]}..."
 
 
-# Takes a search spec dict with "type" and "query" keys.
+# Takes a search spec dict with "type" and "query" keys. Never raises:
+# every failure is reported in the returned dict, so callers need no
+# per-task exception bookkeeping. Successful results are served from a
+# short-lived cache; "Error ..." strings from the tools are never cached.
 # Returns a dict with type, query, result string, and success boolean.
 async def execute_single_search(search_spec: Dict) -> Dict:
     """Run one search and return a dict with type, query, result, and success."""
     search_type = search_spec.get("type", "web")
     query = search_spec.get("query", "")
 
-    search_func = get_search_function(search_type)
-
-    if search_func is None:
-        return {
-            "type": search_type,
-            "query": query,
-            "result": f"Unknown search type: {search_type}. Use 'web', 'wikipedia', 'news', or 'arxiv'.",
-            "success": False
-        }
-
     try:
+        cache_key = _cache.make_key(search_type.lower(), query)
+        cached = _cache.get(cache_key)
+        if cached is not None:
+            return {
+                "type": search_type,
+                "query": query,
+                "result": cached,
+                "success": True
+            }
+
+        search_func = get_search_function(search_type)
+
+        if search_func is None:
+            return {
+                "type": search_type,
+                "query": query,
+                "result": f"Unknown search type: {search_type}. Use 'web', 'wikipedia', 'news', or 'arxiv'.",
+                "success": False
+            }
+
         result = await search_func(query)
+        if not result.startswith("Error"):
+            _cache.set(cache_key, result)
         return {
             "type": search_type,
             "query": query,
@@ -104,47 +120,48 @@ async def execute_single_search(search_spec: Dict) -> Dict:
         }
 
 
-# Takes a list of search specs. Dispatches all concurrently with a wall-clock
-# timeout, formats per-source status, and returns a combined summary string.
+# Takes a list of search specs. Identical (type, query) pairs are dispatched
+# once and their result is fanned back out to every position. All searches
+# run concurrently under one wall-clock budget; searches still running at the
+# deadline are cancelled and reported as timed out while finished ones keep
+# their results. Formats per-source status and returns a combined summary string.
 async def parallel_search(searches: List[Dict]) -> str:
     """Dispatch a list of search specs concurrently; return a formatted summary."""
-    try:
-        tasks = [execute_single_search(s) for s in searches]
-        results = await asyncio.wait_for(
-            asyncio.gather(*tasks, return_exceptions=True),
-            timeout=PARALLEL_TIMEOUT,
-        )
-    except asyncio.TimeoutError:
-        return f"Error: Parallel search timed out after {PARALLEL_TIMEOUT}s"
-
-    processed = []
-    for i, result in enumerate(results):
-        if isinstance(result, Exception):
-            processed.append({
-                "type": searches[i].get("type", "unknown"),
-                "query": searches[i].get("query", ""),
-                "result": f"Execution error: {str(result)}",
-                "success": False,
-            })
-        else:
-            processed.append(result)
+    keys = [(s.get("type", "web").lower(), s.get("query", "")) for s in searches]
+    tasks: Dict[tuple, asyncio.Future] = {}
+    for key, spec in zip(keys, searches):
+        if key not in tasks:
+            tasks[key] = asyncio.ensure_future(execute_single_search(spec))
+
+    _, pending = await asyncio.wait(tasks.values(), timeout=PARALLEL_TIMEOUT)
+
+    for task in pending:
+        task.cancel()
+    if pending:
+        # Let cancellations settle so no task is left dangling on the loop
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    processed = [
+        {
+            "type": spec.get("type", "unknown"),
+            "query": spec.get("query", ""),
+            "result": f"Error: Search timed out after {PARALLEL_TIMEOUT}s",
+            "success": False,
+        } if tasks[key] in pending else tasks[key].result()
+        for spec, key in zip(searches, keys)
+    ]
 
     success_count = sum(1 for r in processed if r["success"])
 
     output_lines = [
-        f"Parallel search completed: {success_count}/{len(processed)} successful\n"
-    ]
-
-    for r in processed:
-        status = "SUCCESS" if r["success"] else "FAILED"
-        search_type = r["type"].upper()
-        truncated_result = truncate_result(r["result"], r["type"])
-
-        output_lines.append(
-            f"--- [{search_type}] {status} ---\n"
+        f"Parallel search completed: {success_count}/{len(processed)} successful\n",
+        *(
+            f"--- [{r['type'].upper()}] {'SUCCESS' if r['success'] else 'FAILED'} ---\n"
             f"Query: {r['query']}\n"
-            f"{truncated_result}\n"
-        )
+            f"{truncate_result(r['result'], r['type'])}\n"
+            for r in processed
+        ),
+    ]
 
     return "\n".join(output_lines)
 
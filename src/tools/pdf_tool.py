@@ -1,12 +1,23 @@
 """PDF reader tool — fetches and extracts text from PDF files at URLs."""
 
+import asyncio
+import atexit
 import io
+import multiprocessing
 import re
-from typing import Optional
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import aclosing
+from typing import List, Optional, Tuple
 
 from langchain_core.tools import tool
-from src.utils import async_retry_on_error, async_fetch, safe_tool_call, require_input
-from src.constants import DEFAULT_USER_AGENT, PDF_MAX_PAGES
+from src.utils import (
+    async_retry_on_error, async_fetch_chunks, safe_tool_call, require_input, TTLCache,
+)
+from src.constants import (
+    DEFAULT_USER_AGENT, PDF_MAX_PAGES, PDF_EXTRACT_WORKERS, PDF_EXTRACT_TIMEOUT,
+    DEFAULT_CACHE_TTL, PDF_CACHE_MAX_ENTRIES, PDF_CACHE_MAX_BYTES, PDF_PAGES_PER_TASK,
+)
 
 # Try pdfplumber first (better quality), fall back to pypdf
 try:
@@ -28,25 +39,89 @@ except ImportError:
 # ─── Module overview ───────────────────────────────────────────────
 # Fetches PDFs from URLs and extracts text using pdfplumber (or pypdf
 # as fallback). Supports page-limited reads and summary mode.
+# Extraction runs in a worker process so it never blocks the event
+# loop or holds the GIL against concurrent I/O-bound tools.
 # ───────────────────────────────────────────────────────────────────
 
-
-# Takes a URL and timeout. Downloads the PDF bytes via async HTTP.
+# clean_text patterns, compiled once at import
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_SPACES_RE = re.compile(r' {2,}')
+
+# Control characters stripped by clean_text (keeps \t, \n, \r); str.translate
+# deletes them in one C-level pass, cheaper than a regex character class.
+_CONTROL_CHARS_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0b, 0x0c, *range(0x0e, 0x20)])
+
+# Raw PDF bytes by URL, so follow-up reads (e.g. summary then full) skip the download
+_cache = TTLCache(ttl=DEFAULT_CACHE_TTL, maxsize=PDF_CACHE_MAX_ENTRIES)
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+
+
+# Returns the module-level extraction pool (shared with fetch_url's PDF path),
+# creating it on first use so that importing the tool does not start
+# processes. "spawn" is safe in a threaded parent and matches the only start
+# method available on Windows.
+def get_pdf_pool() -> Executor:
+    """Returns the shared PDF extraction process pool, creating it if needed."""
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=PDF_EXTRACT_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        atexit.register(_pdf_pool.shutdown, wait=False)
+    return _pdf_pool
+
+
+# Takes the pool an extraction timed out or broke on. Kills its workers and
+# forgets it so the next call starts a fresh pool: a timed-out task would
+# keep running in its worker, and a pool that lost a worker raises
+# BrokenProcessPool on every later submit. No-op if the pool was already
+# replaced (or is not the shared pool, as in tests).
+def discard_pdf_pool(pool: Executor) -> None:
+    """Tear down a stuck or broken PDF pool so it gets recreated."""
+    global _pdf_pool
+    if pool is not _pdf_pool:
+        return
+    _pdf_pool = None
+    for process in list((pool._processes or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+# Takes a URL and timeout. Streams the PDF body into a single buffer, checking
+# the %PDF magic on the first bytes so non-PDF responses abort before the full
+# download. PDFs under PDF_CACHE_MAX_BYTES are cached by URL.
 # Returns raw PDF bytes; raises if the response is not a valid PDF.
 @async_retry_on_error(max_retries=2, delay=1.0)
 async def fetch_pdf(url: str, timeout: int = 30) -> bytes:
     """Fetch PDF content from a URL as bytes."""
+    cached = _cache.get(url)
+    if cached is not None:
+        return cached
+
     headers = {
         "User-Agent": DEFAULT_USER_AGENT,
         "Accept": "application/pdf,*/*",
     }
 
-    content_bytes = await async_fetch(url, headers=headers, timeout=timeout, response_type="bytes")
-
-    if not content_bytes[:4] == b'%PDF':
+    buf = io.BytesIO()
+    head = b""
+    async with aclosing(async_fetch_chunks(url, headers=headers, timeout=timeout)) as chunks:
+        async for chunk in chunks:
+            if len(head) < 4:
+                head = (head + chunk)[:4]
+                if len(head) == 4 and head != b'%PDF':
+                    raise ValueError("URL does not point to a PDF file")
+            buf.write(chunk)
+
+    if head != b'%PDF':
         raise ValueError("URL does not point to a PDF file")
 
-    return content_bytes
+    content = buf.getvalue()
+    if len(content) < PDF_CACHE_MAX_BYTES:
+        _cache.set(url, content)
+    return content
 
 
 # Takes PDF bytes and optional page limit. Delegates to pdfplumber or pypdf.
@@ -106,39 +181,97 @@ def _extract_with_pdfplumber(pdf_content: bytes, max_pages: Optional[int] = None
 def _extract_with_pypdf(pdf_content: bytes, max_pages: Optional[int] = None) -> str:
     """Extract text using pypdf (fallback)."""
     try:
-        pdf_file = io.BytesIO(pdf_content)
-        reader = PdfReader(pdf_file)
+        header, total_pages, pages_to_read = _pypdf_header(pdf_content, max_pages)
+        page_texts = _pypdf_page_range(pdf_content, 0, pages_to_read)
+        return _format_pypdf(header, page_texts, total_pages, max_pages)
 
-        total_pages = len(reader.pages)
-        pages_to_read = min(total_pages, max_pages) if max_pages else total_pages
+    except Exception as e:
+        return f"Error extracting text from PDF: {str(e)}"
 
-        text_parts = []
-        text_parts.append(f"[PDF Document - {total_pages} pages]")
-
-        metadata = reader.metadata
-        if metadata:
-            if metadata.title:
-                text_parts.append(f"Title: {metadata.title}")
-            if metadata.author:
-                text_parts.append(f"Author: {metadata.author}")
-            if metadata.subject:
-                text_parts.append(f"Subject: {metadata.subject}")
-            text_parts.append("")
 
-        for i in range(pages_to_read):
-            page = reader.pages[i]
-            page_text = page.extract_text()
+# Takes PDF bytes and optional page limit. Returns the document header lines
+# (page count and metadata), the total page count, and how many pages to read.
+def _pypdf_header(pdf_content: bytes, max_pages: Optional[int] = None) -> Tuple[List[str], int, int]:
+    """Read page count and metadata with pypdf."""
+    reader = PdfReader(io.BytesIO(pdf_content))
 
-            if page_text:
-                text_parts.append(f"--- Page {i + 1} ---")
-                text_parts.append(page_text.strip())
-                text_parts.append("")
+    total_pages = len(reader.pages)
+    pages_to_read = min(total_pages, max_pages) if max_pages else total_pages
 
-        if max_pages and total_pages > max_pages:
-            text_parts.append(f"[... {total_pages - max_pages} more pages not shown ...]")
+    header = [f"[PDF Document - {total_pages} pages]"]
 
-        return "\n".join(text_parts)
+    metadata = reader.metadata
+    if metadata:
+        if metadata.title:
+            header.append(f"Title: {metadata.title}")
+        if metadata.author:
+            header.append(f"Author: {metadata.author}")
+        if metadata.subject:
+            header.append(f"Subject: {metadata.subject}")
+        header.append("")
+
+    return header, total_pages, pages_to_read
 
+
+# Takes PDF bytes and a [start, stop) page range. The reader object can't be
+# pickled, so each pool task re-parses the bytes and extracts its own range.
+# Returns the raw text of each page, "" for pages without text.
+def _pypdf_page_range(pdf_content: bytes, start: int, stop: int) -> List[str]:
+    """Extract the text of pages start..stop-1 with pypdf."""
+    reader = PdfReader(io.BytesIO(pdf_content))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+# Joins header lines and per-page texts into the extractor's output format.
+def _format_pypdf(header: List[str], page_texts: List[str], total_pages: int,
+                  max_pages: Optional[int]) -> str:
+    """Assemble pypdf extraction results into the tool's text layout."""
+    text_parts = list(header)
+
+    for i, page_text in enumerate(page_texts, 1):
+        if page_text:
+            text_parts.append(f"--- Page {i} ---")
+            text_parts.append(page_text.strip())
+            text_parts.append("")
+
+    if max_pages and total_pages > max_pages:
+        text_parts.append(f"[... {total_pages - max_pages} more pages not shown ...]")
+
+    return "\n".join(text_parts)
+
+
+# Takes an executor, a picklable func(pdf_content, start, stop) -> List[str],
+# PDF bytes, and a page count. Splits the pages into ranges of at least
+# PDF_PAGES_PER_TASK, one per pool task, and runs them concurrently.
+# Returns the per-page results in page order.
+async def map_page_ranges(pool: Executor, func, pdf_content: bytes, pages: int) -> List[str]:
+    """Run func over page ranges of a PDF concurrently; return per-page results."""
+    loop = asyncio.get_running_loop()
+    step = max(PDF_PAGES_PER_TASK, -(-pages // PDF_EXTRACT_WORKERS))
+    ranges = await asyncio.gather(*(
+        loop.run_in_executor(pool, func, pdf_content, start, min(start + step, pages))
+        for start in range(0, pages, step)
+    ))
+    return [text for page_range in ranges for text in page_range]
+
+
+# Takes an executor, PDF bytes and optional page limit. pypdf extraction is
+# pure Python, so long documents are split into page ranges extracted
+# concurrently across the worker pool. Returns the same text as
+# _extract_with_pypdf; a broken pool is raised for the caller to discard.
+async def _extract_with_pypdf_parallel(pool: Executor, pdf_content: bytes, max_pages: Optional[int] = None) -> str:
+    """Extract text with pypdf, spreading page ranges over the PDF pool."""
+    loop = asyncio.get_running_loop()
+    try:
+        header, total_pages, pages_to_read = await loop.run_in_executor(
+            pool, _pypdf_header, pdf_content, max_pages,
+        )
+        page_texts = await map_page_ranges(pool, _pypdf_page_range, pdf_content, pages_to_read)
+
+        return _format_pypdf(header, page_texts, total_pages, max_pages)
+
+    except BrokenProcessPool:
+        raise
     except Exception as e:
         return f"Error extracting text from PDF: {str(e)}"
 
@@ -147,9 +280,9 @@ def _extract_with_pypdf(pdf_content: bytes, max_pages: Optional[int] = None) ->
 # and truncates to max_length. Returns the cleaned string.
 def clean_text(text: str, max_length: int = 15000) -> str:
     """Clean and truncate extracted text."""
-    text = re.sub(r'\n{3,}', '\n\n', text)
-    text = re.sub(r' {2,}', ' ', text)
-    text = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f]', '', text)
+    text = _BLANK_LINES_RE.sub('\n\n', text)
+    text = _SPACES_RE.sub(' ', text)
+    text = text.translate(_CONTROL_CHARS_TABLE)
 
     if len(text) > max_length:
         text = text[:max_length] + f"\n\n[... Content truncated at {max_length} characters ...]"
@@ -211,8 +344,18 @@ async def pdf_reader(input_str: str) -> str:
     # Fetch the PDF
     pdf_content = await fetch_pdf(url)
 
-    # Extract text
-    text = extract_text_from_pdf(pdf_content, max_pages)
+    # Extract text in the worker pool
+    pool = get_pdf_pool()
+    try:
+        if PDF_LIBRARY in ("pypdf", "PyPDF2"):
+            extraction = _extract_with_pypdf_parallel(pool, pdf_content, max_pages)
+        else:
+            loop = asyncio.get_running_loop()
+            extraction = loop.run_in_executor(pool, extract_text_from_pdf, pdf_content, max_pages)
+        text = await asyncio.wait_for(extraction, timeout=PDF_EXTRACT_TIMEOUT)
+    except (asyncio.TimeoutError, BrokenProcessPool):
+        discard_pdf_pool(pool)
+        raise
 
     # Clean and return
     return clean_text(text)
@@ -1,157 +1,450 @@
 """Python REPL tool — process-isolated code execution with timeout and restricted builtins."""
 
+import ast
+import functools
+import importlib
 import multiprocessing
+import os
+import pickle
+import queue
+import random
+import re
+import select
+import signal
+import string
+import sys
+from io import StringIO
+from types import CodeType
+from typing import Optional, Tuple
+
 from langchain_core.tools import tool
 
+try:
+    import resource  # Unix only; limits are skipped where unavailable
+except ImportError:
+    resource = None
+
 from src.constants import MAX_OUTPUT_LENGTH
 from src.utils import truncate
 
 # ─── Module overview ───────────────────────────────────────────────
-# Runs user-supplied Python code in a sandboxed child process with
-# restricted builtins, a 5-second timeout, and captured stdout/stderr.
+# Runs user-supplied Python code in a pool of reusable sandboxed worker
+# processes with restricted builtins, CPU/memory rlimits, a 5-second
+# timeout, and captured stdout/stderr.
 # ───────────────────────────────────────────────────────────────────
 
 
 # Configuration
 EXECUTION_TIMEOUT = 5  # seconds
+WORKER_GRACE_PERIOD = 1  # extra seconds before a worker that ignored its timer is killed
+COMPILE_CACHE_SIZE = 256  # distinct snippets kept compiled
+REPL_WORKERS = 2  # long-lived worker processes
+REPL_MEMORY_LIMIT_MB = 512  # address space user code may add on top of a warm worker
 
 
-# Runs code inside a child process with restricted builtins and
-# optional numpy/pandas. Puts (kind, value) tuple onto result_queue.
-def _execute_code_in_process(code: str, result_queue: multiprocessing.Queue):
-    """Run code in a child process with restricted builtins; results via queue."""
-    import sys
-    from io import StringIO
-    from contextlib import redirect_stdout, redirect_stderr
-
-    # Import optional data science libraries if available
-    optional_modules = {}
+# Takes a format string. Yields every replacement field name in it,
+# including fields nested in format specs ("{0:{1}}").
+def _format_fields(fmt: str):
+    """Field names of a str.format template."""
     try:
-        import numpy as np
-        optional_modules["np"] = np
-        optional_modules["numpy"] = np
-    except ImportError:
-        pass
+        parsed = list(string.Formatter().parse(fmt))
+    except ValueError:
+        return  # malformed; .format() itself will raise
+    for _, field, spec, _ in parsed:
+        if field:
+            yield field
+        if spec:
+            yield from _format_fields(spec)
+
+
+# Public attributes of generators, coroutines, frames and tracebacks that
+# lead back to the frames (and so the module globals) of the code running
+# the sandbox, e.g. gen.gi_frame.f_back.f_globals from inside a generator.
+_FRAME_ATTRIBUTES = frozenset({
+    "gi_frame", "gi_code", "cr_frame", "cr_code", "ag_frame", "ag_code",
+    "f_back", "f_code", "f_globals", "f_locals", "f_builtins",
+    "tb_frame", "tb_next",
+})
+
+
+# Takes an attribute name. Returns True if code may not access it.
+def _is_blocked_attribute(name: str) -> bool:
+    """Check an attribute name against the private and frame attribute rules."""
+    return name.startswith("_") or name in _FRAME_ATTRIBUTES
+
+
+# Takes an ast.Attribute node. Returns why it may not run, or None.
+# Private attributes (the usual way out of a restricted-builtins sandbox,
+# e.g. ().__class__.__bases__) and frame attributes are rejected outright.
+# str.format and format_map look attributes up themselves
+# ("{0.__class__}".format(())), so they are only allowed on a literal
+# template whose fields are checked here; a template built at runtime can't
+# be vetted and is rejected.
+def _attribute_violation(node: ast.Attribute) -> Optional[str]:
+    """Vet one attribute access in submitted code."""
+    if node.attr.startswith("_"):
+        return f"Access to private attribute '{node.attr}' is not allowed"
+    if node.attr in _FRAME_ATTRIBUTES:
+        return f"Access to frame attribute '{node.attr}' is not allowed"
+    if node.attr in ("format", "format_map"):
+        template = node.value
+        if not (isinstance(template, ast.Constant) and isinstance(template.value, str)):
+            return f"'.{node.attr}()' is only allowed on a string literal; use an f-string instead"
+        for field in _format_fields(template.value):
+            # The first part names an argument; the rest are attribute/index lookups
+            if any(_is_blocked_attribute(part) for part in re.split(r"[.\[\]]", field)[1:]):
+                return "Format fields may not access private or frame attributes"
+    return None
+
+
+# Takes a code string. Parses it exactly once as statements; a lone
+# expression statement is compiled in eval mode so its value can be echoed,
+# anything else in exec mode. Rejects attribute access that could reach
+# private attributes or frames (see _attribute_violation), and memoizes the
+# code object so repeated snippets skip both the parser and the compiler.
+# Returns (mode, code object).
+@functools.lru_cache(maxsize=COMPILE_CACHE_SIZE)
+def _compile_code(code: str) -> Tuple[str, CodeType]:
+    """Parse, vet, and compile code in eval mode if possible, else exec mode; cached by source."""
+    tree = ast.parse(code, "<agent>", "exec")
+    if len(tree.body) == 1 and isinstance(tree.body[0], ast.Expr):
+        mode, tree = "eval", ast.Expression(tree.body[0].value)
+    else:
+        mode = "exec"
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute):
+            violation = _attribute_violation(node)
+            if violation:
+                raise ValueError(violation)
+
+    return mode, compile(tree, "<agent>", mode)
+
+
+# Builtins exposed to executed code; everything else (open, __import__, ...)
+# is unavailable.
+_SAFE_BUILTINS = {
+    "abs": abs,
+    "all": all,
+    "any": any,
+    "bin": bin,
+    "bool": bool,
+    "bytes": bytes,
+    "chr": chr,
+    "dict": dict,
+    "divmod": divmod,
+    "enumerate": enumerate,
+    "filter": filter,
+    "float": float,
+    "format": format,
+    "frozenset": frozenset,
+    "hex": hex,
+    "int": int,
+    "isinstance": isinstance,
+    "iter": iter,
+    "len": len,
+    "list": list,
+    "map": map,
+    "max": max,
+    "min": min,
+    "next": next,
+    "oct": oct,
+    "ord": ord,
+    "pow": pow,
+    "print": print,
+    "range": range,
+    "repr": repr,
+    "reversed": reversed,
+    "round": round,
+    "set": set,
+    "slice": slice,
+    "sorted": sorted,
+    "str": str,
+    "sum": sum,
+    "tuple": tuple,
+    "type": type,
+    "zip": zip,
+}
+
+# Modules pre-bound in the executed code's namespace
+_SAFE_MODULES = (
+    "math", "statistics", "datetime", "json", "re",
+    "random", "collections", "itertools", "functools",
+)
 
+# Optional data science libraries, bound under each alias if installed
+_OPTIONAL_MODULES = (("np", "numpy"), ("numpy", "numpy"), ("pd", "pandas"), ("pandas", "pandas"))
+
+_safe_globals_base: Optional[dict] = None
+
+
+# Returns the module namespace for executed code, importing everything
+# once per process (in practice once per worker, from _init_worker).
+def _load_safe_globals() -> dict:
+    """Build (once) and return the modules available to executed code."""
+    global _safe_globals_base
+    if _safe_globals_base is None:
+        namespace = {name: importlib.import_module(name) for name in _SAFE_MODULES}
+        for alias, name in _OPTIONAL_MODULES:
+            try:
+                namespace[alias] = importlib.import_module(name)
+            except ImportError:
+                pass
+        _safe_globals_base = namespace
+    return _safe_globals_base
+
+
+# Returns the worker's current virtual address-space size in bytes (Linux),
+# or 0 where /proc is unavailable.
+def _address_space_in_use() -> int:
+    """Read the current process's virtual memory size from /proc."""
     try:
-        import pandas as pd
-        optional_modules["pd"] = pd
-        optional_modules["pandas"] = pd
-    except ImportError:
-        pass
-
-    # Define what's available to the executed code
-    safe_globals = {
-        "__builtins__": {
-            "abs": abs,
-            "all": all,
-            "any": any,
-            "bin": bin,
-            "bool": bool,
-            "bytes": bytes,
-            "chr": chr,
-            "dict": dict,
-            "divmod": divmod,
-            "enumerate": enumerate,
-            "filter": filter,
-            "float": float,
-            "format": format,
-            "frozenset": frozenset,
-            "hex": hex,
-            "int": int,
-            "isinstance": isinstance,
-            "iter": iter,
-            "len": len,
-            "list": list,
-            "map": map,
-            "max": max,
-            "min": min,
-            "next": next,
-            "oct": oct,
-            "ord": ord,
-            "pow": pow,
-            "print": print,
-            "range": range,
-            "repr": repr,
-            "reversed": reversed,
-            "round": round,
-            "set": set,
-            "slice": slice,
-            "sorted": sorted,
-            "str": str,
-            "sum": sum,
-            "tuple": tuple,
-            "type": type,
-            "zip": zip,
-        },
-        "math": __import__("math"),
-        "statistics": __import__("statistics"),
-        "datetime": __import__("datetime"),
-        "json": __import__("json"),
-        "re": __import__("re"),
-        "random": __import__("random"),
-        "collections": __import__("collections"),
-        "itertools": __import__("itertools"),
-        "functools": __import__("functools"),
-    }
-    safe_globals.update(optional_modules)
-
-    stdout_capture = StringIO()
-    stderr_capture = StringIO()
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+# Worker start-up. Builds the executed code's namespace (including the
+# numpy/pandas imports), then caps the worker's address space at its warm
+# baseline plus REPL_MEMORY_LIMIT_MB.
+def _init_worker():
+    """Pre-build the sandbox namespace and apply the memory rlimit in a REPL worker."""
+    _load_safe_globals()
+
+    if hasattr(signal, "setitimer"):
+        signal.signal(signal.SIGALRM, _raise_execution_timeout)
+
+    if resource is not None:
+        limit = _address_space_in_use() + REPL_MEMORY_LIMIT_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+class _ExecutionTimeout(Exception):
+    """Raised inside a worker when a task's wall-clock timer fires."""
+
+
+def _raise_execution_timeout(signum, frame):
+    raise _ExecutionTimeout()
+
+
+# Re-arms the CPU rlimit before each task. The soft limit is set relative to
+# the CPU time the process has already consumed.
+def _arm_cpu_limit():
+    """Allow the next task EXECUTION_TIMEOUT seconds of CPU time in this worker."""
+    if resource is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (used + EXECUTION_TIMEOUT + 1, hard))
+
+
+# Capture buffers, reused across tasks (a worker runs one task at a time)
+_stdout_capture = StringIO()
+_stderr_capture = StringIO()
+
+
+# Runs code inside a worker with restricted builtins and
+# optional numpy/pandas. Fresh shallow copies of the namespace and builtins
+# keep one task's globals from leaking into the next. Returns a (kind, value) tuple.
+def _execute_code_in_process(code: str) -> Tuple[str, str]:
+    """Run code in a worker process with restricted builtins; returns (kind, value)."""
+    safe_globals = {**_load_safe_globals(), "__builtins__": dict(_SAFE_BUILTINS)}
+
+    for buf in (_stdout_capture, _stderr_capture):
+        buf.seek(0)
+        buf.truncate()
     local_namespace = {}
 
+    _arm_cpu_limit()
+
+    # One-shot wall-clock timer (Unix): interrupts slow Python code inside the
+    # worker so it survives for the next task. Code stuck in C, or that
+    # swallows the exception, is killed by the parent instead.
+    timer = hasattr(signal, "setitimer")
+
     try:
-        with redirect_stdout(stdout_capture), redirect_stderr(stderr_capture):
-            try:
-                compiled = compile(code, "<agent>", "eval")
+        saved_stdout, saved_stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = _stdout_capture, _stderr_capture
+        if timer:
+            signal.setitimer(signal.ITIMER_REAL, EXECUTION_TIMEOUT)
+        try:
+            mode, compiled = _compile_code(code)
+            if mode == "eval":
                 eval_result = eval(compiled, safe_globals, local_namespace)
                 if eval_result is not None:
                     print(repr(eval_result))
-            except SyntaxError:
-                exec(code, safe_globals, local_namespace)
+            else:
+                exec(compiled, safe_globals, local_namespace)
+        finally:
+            if timer:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+            sys.stdout, sys.stderr = saved_stdout, saved_stderr
 
-        output = stdout_capture.getvalue()
-        errors = stderr_capture.getvalue()
+        output = _stdout_capture.getvalue()
+        errors = _stderr_capture.getvalue()
 
         if errors:
-            result_queue.put(("output", f"Output:\n{output}\n\nWarnings:\n{errors}"))
-        elif output:
-            result_queue.put(("output", output.strip()))
-        else:
-            result_queue.put(("output", "Code executed successfully (no output)"))
+            return "output", f"Output:\n{output}\n\nWarnings:\n{errors}"
+        if output:
+            return "output", output.strip()
+        return "output", "Code executed successfully (no output)"
 
+    except _ExecutionTimeout:
+        return "timeout", ""
     except Exception as e:
         error_type = type(e).__name__
-        result_queue.put(("error", f"Execution Error ({error_type}): {str(e)}"))
+        return "error", f"Execution Error ({error_type}): {str(e)}"
+
+
+# Reseeds the global random generators from OS entropy. Every task's child
+# is forked from the same warm worker and would otherwise inherit, and
+# replay, the same random and numpy.random streams.
+def _reset_shared_state() -> None:
+    """Give the task unpredictable random and numpy.random streams."""
+    random.seed()
+    numpy = sys.modules.get("numpy")
+    if numpy is not None:
+        numpy.random.seed()
+
+
+# Where fork() exists, each task runs in a child forked from the warm worker:
+# it starts with everything already imported, and anything it changes (module
+# or class attributes, numpy/pandas options, or the worker itself via an
+# escape from the sandbox) dies with it. Elsewhere workers are retired after
+# a single task instead (see execute_python).
+_FORK_PER_TASK = hasattr(os, "fork")
+
+
+# Takes (code, conn). Runs one task in a forked child of this worker and
+# waits for its pickled result. A child stuck past the timeout (e.g. in C
+# code) gets its CPU rlimit one second later and is killed here after two.
+# Returns the (kind, value) tuple.
+def _run_task_in_fork(code: str, conn) -> Tuple[str, str]:
+    """Execute code in a throwaway child of the worker."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read_fd)
+            conn.close()  # the task gets no handle on the parent's pipe
+            _reset_shared_state()
+            payload = pickle.dumps(_execute_code_in_process(code))
+            with os.fdopen(write_fd, "wb") as pipe:
+                pipe.write(payload)
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as pipe:
+        ready, _, _ = select.select([pipe], [], [], EXECUTION_TIMEOUT + 2 * WORKER_GRACE_PERIOD)
+        if not ready:
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+            return "timeout", ""
+        payload = pipe.read()
+    _, status = os.waitpid(pid, 0)
 
+    if not payload:
+        exit_code = os.waitstatus_to_exitcode(status)
+        return "error", f"Execution Error (WorkerExit): Sandbox process exited with code {exit_code}."
+    return pickle.loads(payload)
 
-# Takes a code string. Spawns a child process, enforces the timeout,
-# and returns captured output or an error/timeout message.
+
+# Worker process main loop. Prepares the sandbox, reports ready, then runs
+# each code string received over the pipe until the parent closes it.
+# Workers are reused across callers, so each task runs in its own forked
+# child and never touches the worker's own state.
+def _worker_loop(conn) -> None:
+    """Serve execution requests from the parent over a pipe."""
+    _init_worker()
+    conn.send(("ready", ""))
+    while True:
+        try:
+            code = conn.recv()
+        except EOFError:
+            return
+        if _FORK_PER_TASK:
+            conn.send(_run_task_in_fork(code, conn))
+        else:
+            _reset_shared_state()
+            conn.send(_execute_code_in_process(code))
+
+
+class _Worker:
+    """One long-lived sandbox process and the parent's end of its pipe."""
+
+    # Uses "spawn" so the worker starts clean even when the parent is
+    # threaded, and blocks until it has finished importing so startup never
+    # eats into a task's timeout.
+    def __init__(self):
+        ctx = multiprocessing.get_context("spawn")
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.conn.recv()  # readiness message
+
+    # Takes a code string. Returns the worker's (kind, value) result, or
+    # ("hung", "") / ("exit", message) if it did not answer in time or died
+    # mid-task. The worker times out a forked task itself, so it gets a
+    # further grace period here before it is presumed hung.
+    def run(self, code: str) -> Tuple[str, str]:
+        """Send code to the worker and wait for the result."""
+        self.conn.send(code)
+        if not self.conn.poll(EXECUTION_TIMEOUT + 3 * WORKER_GRACE_PERIOD):
+            return "hung", ""
+        try:
+            return self.conn.recv()
+        except EOFError:
+            self.process.join()
+            return "exit", f"Execution Error (WorkerExit): Sandbox process exited with code {self.process.exitcode}."
+
+    def kill(self) -> None:
+        """Kill the process (a runaway task cannot be interrupted any other way)."""
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+# Idle workers. Each slot starts as None and is filled with a live worker on
+# first checkout, so importing the tool starts no processes; a killed worker's
+# slot goes back as None and is respawned the same way.
+_idle_workers: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+for _ in range(REPL_WORKERS):
+    _idle_workers.put(None)
+
+
+# Takes a code string. Runs it on an idle worker process; a worker that hung
+# or died is killed and replaced, as is every worker after one task where
+# tasks can't be forked off it. Returns captured output or an error/timeout
+# message.
 def execute_python(code: str) -> str:
-    """Spawn a child process to run code, kill on timeout, return captured output."""
-    result_queue = multiprocessing.Queue()
-    process = multiprocessing.Process(
-        target=_execute_code_in_process,
-        args=(code, result_queue),
-    )
-
-    process.start()
-    process.join(timeout=EXECUTION_TIMEOUT)
-
-    # If the process is still running, kill it
-    if process.is_alive():
-        process.kill()    # Forcefully terminate -- no orphaned loops
-        process.join(1)   # Wait briefly for cleanup
-        return f"Timeout Error: Code execution exceeded {EXECUTION_TIMEOUT} seconds. The operation was too slow or contains an infinite loop."
+    """Run code on a pooled worker, kill it if it hangs, return captured output."""
+    worker = _idle_workers.get()
+    try:
+        if worker is None or not worker.process.is_alive():
+            worker = _Worker()
+        kind, value = worker.run(code)
+    except BaseException:
+        if worker is not None:
+            worker.kill()
+        _idle_workers.put(None)
+        raise
 
-    # Get result from the queue
-    if not result_queue.empty():
-        kind, value = result_queue.get_nowait()
-        if kind == "error":
-            return value
-        output = value
+    if kind in ("hung", "exit") or not _FORK_PER_TASK:
+        worker.kill()
+        _idle_workers.put(None)
     else:
-        output = "Code executed successfully (no output)"
+        _idle_workers.put(worker)
+
+    if kind in ("hung", "timeout"):
+        return f"Timeout Error: Code execution exceeded {EXECUTION_TIMEOUT} seconds. The operation was too slow or contains an infinite loop."
+
+    if kind == "error":
+        return value
+    output = value
 
     # Truncate if too long
     output = truncate(output, MAX_OUTPUT_LENGTH, suffix=f"\n\n[Output truncated - exceeded {MAX_OUTPUT_LENGTH} characters]")
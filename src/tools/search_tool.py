@@ -9,11 +9,11 @@ from pydantic import BaseModel, Field
 
 from src.utils import (
     async_retry_on_error, async_run_with_timeout,
-    truncate, safe_tool_call, require_input,
+    truncate, cached_tool, safe_tool_call, require_input,
 )
 from src.constants import (
     DEFAULT_SEARCH_TIMEOUT, DEFAULT_MAX_RESULTS, MAX_SEARCH_RESULTS,
-    SNIPPET_MAX_CHARS,
+    SNIPPET_MAX_CHARS, SEARCH_CACHE_MAX_ENTRIES,
 )
 
 # ─── Module overview ───────────────────────────────────────────────
@@ -21,10 +21,21 @@ from src.constants import (
 # Schema is enforced by Anthropic's tool-use API via args_schema.
 # ───────────────────────────────────────────────────────────────────
 
+# Failures worth retrying: DuckDuckGo rate limits and upstream errors, the
+# thread timeout from async_run_with_timeout, and dropped connections.
+# Anything else (bad arguments, bugs) surfaces immediately.
+try:
+    from duckduckgo_search.exceptions import DuckDuckGoSearchException
+    RETRYABLE_ERRORS = (DuckDuckGoSearchException, TimeoutError, ConnectionError)
+except ImportError:
+    RETRYABLE_ERRORS = (TimeoutError, ConnectionError)
+
 
 # Takes (query, max_results, region). Runs a DuckDuckGo text search in a thread
-# with timeout protection. Returns a list of result dicts.
-@async_retry_on_error(max_retries=2, delay=2.0, exceptions=(Exception,))
+# with timeout protection; agents often repeat a query across reasoning steps,
+# so results are cached by those arguments. Returns a list of result dicts.
+@cached_tool("web", maxsize=SEARCH_CACHE_MAX_ENTRIES)
+@async_retry_on_error(max_retries=2, delay=2.0, exceptions=RETRYABLE_ERRORS)
 async def async_web_search(
     query: str,
     max_results: int = DEFAULT_MAX_RESULTS,
@@ -63,26 +74,23 @@ async def web_search(
         return err
 
     max_results = min(int(max_results), MAX_SEARCH_RESULTS)
-    results = await async_web_search(query, max_results, region)
+    # Collapse whitespace so trivially different spellings share a cache entry
+    results = await async_web_search(" ".join(query.split()), max_results, region)
 
     if not results:
         return f"No search results found for '{query}'"
 
-    formatted_results = []
-    for i, result in enumerate(results, 1):
-        title = result.get("title", "No title")
-        url = result.get("href", result.get("link", "No URL"))
-        snippet = result.get("body", result.get("snippet", "No description"))
-        snippet = truncate(snippet, SNIPPET_MAX_CHARS)
+    header = f"Found {len(results)} results for '{query}':\n"
+    return header + "\n\n".join(
+        f"{i}. **{r.get('title', 'No title')}**\n"
+        f"   URL: {r.get('href', r.get('link', 'No URL'))}\n"
+        f"   {truncate(r.get('body', r.get('snippet', 'No description')), SNIPPET_MAX_CHARS)}"
+        for i, r in enumerate(results, 1)
+    )
 
-        formatted_results.append(
-            f"{i}. **{title}**\n"
-            f"   URL: {url}\n"
-            f"   {snippet}"
-        )
 
-    header = f"Found {len(results)} results for '{query}':\n"
-    return header + "\n\n".join(formatted_results)
+# Expose cache for tests (async_web_search._cache)
+_cache = async_web_search._cache
 
 
 class WebSearchInput(BaseModel):
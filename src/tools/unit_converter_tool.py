@@ -11,6 +11,12 @@ from pydantic import BaseModel, Field
 # special-case handling for temperature.
 # ───────────────────────────────────────────────────────────────────
 
+# Natural-language request: optional "convert", value, unit, "to", unit
+_CONVERSION_RE = re.compile(
+    r'(?:convert\s+)?(-?[\d.]+)\s*([a-zA-Z_/]+)\s+to\s+([a-zA-Z_/]+)',
+    re.IGNORECASE,
+)
+
 # Conversion factors to base units
 # Length: base unit = meters
 LENGTH_TO_METERS = {
@@ -103,34 +109,39 @@ UNIT_CATEGORIES = {
     "data": DATA_TO_BYTES,
 }
 
+# Temperature unit spellings -> canonical name (converted by formula, not factor)
+_TEMP_ALIASES = {
+    "c": "celsius", "celsius": "celsius",
+    "f": "fahrenheit", "fahrenheit": "fahrenheit",
+    "k": "kelvin", "kelvin": "kelvin",
+}
+
+# Flat index: unit name -> (category, factor to base unit). Built once so a
+# lookup is a single hash instead of a scan over every category. The first
+# category listing a unit wins ("weight" over its "mass" alias).
+_UNIT_INDEX: Dict[str, Tuple[str, float]] = {}
+for _category, _conversions in UNIT_CATEGORIES.items():
+    for _unit, _factor in _conversions.items():
+        _UNIT_INDEX.setdefault(_unit, (_category, _factor))
+
 
 # Looks up which category (length, weight, etc.) a unit belongs to.
 # Returns (category_name, conversion_dict) or None if not found.
 def find_unit_category(unit: str) -> Optional[Tuple[str, Dict]]:
     """Return (category_name, conversion_dict) for a unit, or None."""
-    unit_lower = unit.lower().replace(" ", "_")
-    for category, conversions in UNIT_CATEGORIES.items():
-        if unit_lower in conversions:
-            return category, conversions
-    return None
+    entry = _UNIT_INDEX.get(unit.lower().replace(" ", "_"))
+    if entry is None:
+        return None
+    return entry[0], UNIT_CATEGORIES[entry[0]]
 
 
 # Takes (value, from_unit, to_unit). Converts via intermediate Celsius.
 # Returns the converted temperature as a float.
 def convert_temperature(value: float, from_unit: str, to_unit: str) -> float:
     """Convert between Celsius, Fahrenheit, and Kelvin."""
-    from_unit = from_unit.lower()
-    to_unit = to_unit.lower()
-
     # Normalize unit names
-    temp_aliases = {
-        "c": "celsius", "celsius": "celsius",
-        "f": "fahrenheit", "fahrenheit": "fahrenheit",
-        "k": "kelvin", "kelvin": "kelvin",
-    }
-
-    from_unit = temp_aliases.get(from_unit)
-    to_unit = temp_aliases.get(to_unit)
+    from_unit = _TEMP_ALIASES.get(from_unit.lower())
+    to_unit = _TEMP_ALIASES.get(to_unit.lower())
 
     if not from_unit or not to_unit:
         raise ValueError("Unknown temperature unit")
@@ -164,29 +175,27 @@ def convert_units(value: float, from_unit: str, to_unit: str) -> str:
     to_unit_clean = to_unit.lower().replace(" ", "_")
 
     # Check for temperature (special case)
-    temp_units = {"c", "f", "k", "celsius", "fahrenheit", "kelvin"}
-    if from_unit_clean in temp_units and to_unit_clean in temp_units:
+    if from_unit_clean in _TEMP_ALIASES and to_unit_clean in _TEMP_ALIASES:
         result = convert_temperature(value, from_unit_clean, to_unit_clean)
         return f"{value} {from_unit} = {result:.4g} {to_unit}"
 
-    # Find the category for source unit
-    from_info = find_unit_category(from_unit_clean)
-    to_info = find_unit_category(to_unit_clean)
+    # Look up category and base-unit factor for each side
+    from_info = _UNIT_INDEX.get(from_unit_clean)
+    to_info = _UNIT_INDEX.get(to_unit_clean)
 
     if not from_info:
         return f"Error: Unknown unit '{from_unit}'"
     if not to_info:
         return f"Error: Unknown unit '{to_unit}'"
 
-    from_category, from_conversions = from_info
-    to_category, to_conversions = to_info
+    from_category, from_factor = from_info
+    to_category, to_factor = to_info
 
     if from_category != to_category:
         return f"Error: Cannot convert {from_category} ({from_unit}) to {to_category} ({to_unit})"
 
     # Convert: value -> base unit -> target unit
-    base_value = value * from_conversions[from_unit_clean]
-    result = base_value / to_conversions[to_unit_clean]
+    result = value * from_factor / to_factor
 
     return f"{value} {from_unit} = {result:.6g} {to_unit}"
 
@@ -235,10 +244,7 @@ def convert(input_str: str) -> str:
     """Parse '10 km to miles' string and convert. Used by tests and CLI."""
     if not input_str or not input_str.strip():
         return "Error: No conversion request provided."
-    m = re.match(
-        r'(?:convert\s+)?(-?[\d.]+)\s*([a-zA-Z_/]+)\s+to\s+([a-zA-Z_/]+)',
-        input_str.strip(), re.IGNORECASE,
-    )
+    m = _CONVERSION_RE.match(input_str.strip())
     if not m:
         return f"Error: Could not parse '{input_str}'. Use format: '10 km to miles'"
     return convert_units(float(m.group(1)), m.group(2).lower(), m.group(3).lower())
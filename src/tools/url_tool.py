@@ -1,29 +1,76 @@
 """URL content fetcher — extracts readable text from web pages and PDFs."""
 
 import asyncio
+import re
+import time
 import aiohttp
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures.process import BrokenProcessPool
 from io import BytesIO
+from typing import List, Optional, Tuple, Union
 from langchain_core.tools import tool
-from src.utils import async_retry_on_error, get_aiohttp_session, safe_tool_call, require_input
-from src.constants import DEFAULT_USER_AGENT, DEFAULT_HTTP_TIMEOUT
+from src.utils import (
+    async_retry_on_error, get_aiohttp_session, safe_tool_call, require_input, TTLCache,
+)
+from src.constants import (
+    DEFAULT_USER_AGENT, DEFAULT_HTTP_TIMEOUT, HTTP_STREAM_CHUNK_SIZE, HTML_MAX_BYTES,
+    DEFAULT_CACHE_TTL, URL_CACHE_MAX_ENTRIES, URL_CACHE_MAX_AGE, PDF_EXTRACT_TIMEOUT,
+)
+from src.tools.pdf_tool import get_pdf_pool, discard_pdf_pool, map_page_ranges
 
 # ─── Module overview ───────────────────────────────────────────────
 # Fetches and extracts readable text from web pages and PDFs at a
 # given URL. Strips boilerplate HTML and extracts page metadata.
 # ───────────────────────────────────────────────────────────────────
 
-# Try to import pypdf for PDF support
+# PDF support: prefer PDFium (native code, via pypdfium2) for text
+# extraction, fall back to pure-Python pypdf
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
 try:
     from pypdf import PdfReader
-    PDF_SUPPORT = True
 except ImportError:
-    PDF_SUPPORT = False
+    PdfReader = None
+
+PDF_SUPPORT = pdfium is not None or PdfReader is not None
+
+# Prefer lxml for HTML: its tree is walked directly, skipping the per-node
+# Python wrappers BeautifulSoup builds. Without lxml, BeautifulSoup runs on
+# the stdlib html.parser.
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
 
 # Content limits
 MAX_CONTENT_CHARS = 5000
 MAX_PDF_PAGES = 20
 
+# Tags _soup_page_parts reads. Everything else outside them -- the <head>
+# scripts, styles, and links that make up much of a modern page -- is never
+# turned into nodes. A matched tag keeps its whole subtree, so boilerplate
+# inside <body> is still decomposed after parsing.
+_CONTENT_STRAINER = SoupStrainer(["title", "meta", "body", "main", "article", "div", "p", "time"])
+
+# Extracted pages by URL: {"fetched_at", "validators", "result"}. Served as-is
+# for DEFAULT_CACHE_TTL; after that, pages the server sent an ETag or
+# Last-Modified for are revalidated with a conditional GET until
+# URL_CACHE_MAX_AGE, so an unchanged page costs a 304 instead of a re-parse.
+_cache = TTLCache(ttl=URL_CACHE_MAX_AGE, maxsize=URL_CACHE_MAX_ENTRIES)
+
+# Whitespace around a line break, including whole blank lines. Collapsing
+# each run to one newline strips every line and drops the empty ones in a
+# single pass.
+_LINE_BREAK_RE = re.compile(r"\s*\n\s*")
+
+# Extraction results that describe a failure and must not be cached
+_UNCACHEABLE_PREFIXES = ("Error", "Could not extract", "PDF detected")
+
 
 # Pulls author, date, and description from HTML meta tags.
 def _extract_metadata(soup: BeautifulSoup) -> dict:
@@ -66,52 +113,242 @@ def _extract_pdf_content(content: bytes, url: str) -> str:
     """Extract text content from a PDF file."""
     if not PDF_SUPPORT:
         return (
-            "PDF detected but pypdf is not installed. "
-            "Install it with: pip install pypdf"
+            "PDF detected but no PDF library is installed. "
+            "Install one with: pip install pypdfium2 (or pypdf)"
         )
 
     try:
-        pdf_file = BytesIO(content)
-        reader = PdfReader(pdf_file)
+        metadata_parts, total_pages = _read_pdf_header(content)
+        page_texts = _pdf_page_texts(content, 0, min(total_pages, MAX_PDF_PAGES))
+        return _format_pdf_content(metadata_parts, total_pages, page_texts)
 
-        metadata_parts = []
-        if reader.metadata:
-            if reader.metadata.title:
-                metadata_parts.append(f"**Title:** {reader.metadata.title}")
-            if reader.metadata.author:
-                metadata_parts.append(f"**Author:** {reader.metadata.author}")
+    except Exception as e:
+        return f"Error extracting PDF content: {str(e)}"
 
-        metadata_parts.append(f"**Pages:** {len(reader.pages)}")
 
-        pages_to_read = min(len(reader.pages), MAX_PDF_PAGES)
-        text_parts = []
+# Same result as _extract_pdf_content, but the header read and page ranges
+# run concurrently on the shared PDF process pool, keeping pypdf's pure-Python
+# parsing off the event loop.
+async def _extract_pdf_content_parallel(content: bytes, url: str) -> str:
+    """Extract PDF text across the PDF worker pool."""
+    if not PDF_SUPPORT:
+        return _extract_pdf_content(content, url)
 
-        for i in range(pages_to_read):
-            page_text = reader.pages[i].extract_text()
-            if page_text:
-                text_parts.append(f"--- Page {i + 1} ---\n{page_text.strip()}")
+    loop = asyncio.get_running_loop()
+    pool = get_pdf_pool()
+    try:
+        metadata_parts, total_pages = await asyncio.wait_for(
+            loop.run_in_executor(pool, _read_pdf_header, content),
+            timeout=PDF_EXTRACT_TIMEOUT,
+        )
+        page_texts = await asyncio.wait_for(
+            map_page_ranges(pool, _pdf_page_texts, content, min(total_pages, MAX_PDF_PAGES)),
+            timeout=PDF_EXTRACT_TIMEOUT,
+        )
+        return _format_pdf_content(metadata_parts, total_pages, page_texts)
 
-        if len(reader.pages) > MAX_PDF_PAGES:
-            text_parts.append(f"\n[Showing first {MAX_PDF_PAGES} of {len(reader.pages)} pages]")
+    except asyncio.TimeoutError:
+        discard_pdf_pool(pool)
+        return f"Error extracting PDF content: timed out after {PDF_EXTRACT_TIMEOUT}s"
+    except BrokenProcessPool as e:
+        discard_pdf_pool(pool)
+        return f"Error extracting PDF content: {str(e)}"
+    except Exception as e:
+        return f"Error extracting PDF content: {str(e)}"
 
-        content_text = "\n\n".join(text_parts)
 
-        if len(content_text) > MAX_CONTENT_CHARS:
-            content_text = content_text[:MAX_CONTENT_CHARS] + "\n\n[Content truncated]"
+# Takes PDF bytes. Returns (title/author/page-count lines, total page count).
+def _read_pdf_header(content: bytes) -> Tuple[List[str], int]:
+    """Read PDF metadata and page count."""
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(content)
+        try:
+            metadata = pdf.get_metadata_dict()
+            total_pages = len(pdf)
+        finally:
+            pdf.close()
 
-        return "\n".join(metadata_parts) + "\n\n**Content:**\n" + content_text
+        metadata_parts = [
+            f"**{key}:** {metadata[key]}" for key in ("Title", "Author") if metadata.get(key)
+        ]
+        metadata_parts.append(f"**Pages:** {total_pages}")
+        return metadata_parts, total_pages
 
-    except Exception as e:
-        return f"Error extracting PDF content: {str(e)}"
+    reader = PdfReader(BytesIO(content))
 
+    metadata_parts = []
+    if reader.metadata:
+        if reader.metadata.title:
+            metadata_parts.append(f"**Title:** {reader.metadata.title}")
+        if reader.metadata.author:
+            metadata_parts.append(f"**Author:** {reader.metadata.author}")
 
-# Strips navigation/scripts, finds main content area, and extracts clean text.
-# Returns title, metadata, and body content.
-def _extract_html_content(html: str, url: str) -> str:
-    """Extract readable content from HTML."""
-    soup = BeautifulSoup(html, 'html.parser')
+    metadata_parts.append(f"**Pages:** {len(reader.pages)}")
+
+    return metadata_parts, len(reader.pages)
+
+
+# Takes PDF bytes and a [start, stop) page range. Parses the bytes itself so
+# each range can run in its own pool task. Returns one text per page.
+def _pdf_page_texts(content: bytes, start: int, stop: int) -> List[str]:
+    """Extract the text of pages start..stop-1."""
+    if pdfium is not None:
+        return _pdfium_page_texts(content, start, stop)
+
+    reader = PdfReader(BytesIO(content))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+# PDFium variant of _pdf_page_texts. PDFium returns CRLF line breaks, which
+# are normalized to match pypdf's output.
+def _pdfium_page_texts(content: bytes, start: int, stop: int) -> List[str]:
+    """Extract the text of pages start..stop-1 with pypdfium2."""
+    pdf = pdfium.PdfDocument(content)
+    try:
+        texts = []
+        for i in range(start, stop):
+            page = pdf[i]
+            textpage = page.get_textpage()
+            texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+            textpage.close()
+            page.close()
+        return texts
+    finally:
+        pdf.close()
+
+
+# Joins header lines and per-page texts, truncating to MAX_CONTENT_CHARS.
+def _format_pdf_content(metadata_parts: List[str], total_pages: int, page_texts: List[str]) -> str:
+    """Assemble extracted PDF pages into fetch_url's output format."""
+    text_parts = [
+        f"--- Page {i} ---\n{page_text.strip()}"
+        for i, page_text in enumerate(page_texts, 1)
+        if page_text
+    ]
+
+    if total_pages > MAX_PDF_PAGES:
+        text_parts.append(f"\n[Showing first {MAX_PDF_PAGES} of {total_pages} pages]")
+
+    content_text = "\n\n".join(text_parts)
+
+    if len(content_text) > MAX_CONTENT_CHARS:
+        content_text = content_text[:MAX_CONTENT_CHARS] + "\n\n[Content truncated]"
+
+    return "\n".join(metadata_parts) + "\n\n**Content:**\n" + content_text
+
+
+# Tags stripped from the page before text extraction
+_BOILERPLATE_TAGS = ('script', 'style', 'nav', 'footer', 'header', 'aside', 'noscript')
+
+
+# Takes XPath expressions. Returns them compiled once at import (skipping the
+# XPath parser on every page), or () when lxml is unavailable.
+def _compile_xpaths(*expressions: str) -> tuple:
+    """Compile XPath expressions for the lxml extraction path."""
+    return tuple(map(etree.XPath, expressions)) if HTML_PARSER == "lxml" else ()
+
+
+# Main-content candidates, in priority order
+_MAIN_CONTENT_XPATHS = _compile_xpaths(
+    "//main",
+    "//article",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' content ')]",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' post ')]",
+    "//div[contains(concat(' ', normalize-space(@class), ' '), ' article ')]",
+    "//div[@id='content']",
+)
 
-    for element in soup(['script', 'style', 'nav', 'footer', 'header', 'aside', 'noscript']):
+# Non-empty content of the meta tags holding each metadata field, in priority order
+_AUTHOR_META_XPATHS = _compile_xpaths(
+    "//meta[@name='author']/@content[. != '']",
+    "//meta[@property='article:author']/@content[. != '']",
+    "//meta[@name='twitter:creator']/@content[. != '']",
+)
+_DATE_META_XPATHS = _compile_xpaths(
+    "//meta[@property='article:published_time']/@content[. != '']",
+    "//meta[@name='date']/@content[. != '']",
+    "//meta[@name='publish_date']/@content[. != '']",
+    "//time/@datetime",
+)
+_DESC_META_XPATHS = _compile_xpaths(
+    "//meta[@name='description']/@content[. != '']",
+    "//meta[@property='og:description']/@content[. != '']",
+)
+_TITLE_XPATH = etree.XPath("string(//title)") if HTML_PARSER == "lxml" else None
+
+
+# Takes an lxml element. Returns its text nodes, stripped, one per line --
+# the lxml equivalent of get_text(separator='\n', strip=True).
+def _element_text(element) -> str:
+    """Join an element's non-blank text nodes with newlines."""
+    return '\n'.join(t.strip() for t in element.itertext() if t.strip())
+
+
+# Takes an lxml tree and compiled XPaths in priority order. Returns the
+# first value found, or "".
+def _first_match(tree, xpaths: tuple) -> str:
+    """Return the first result of the highest-priority matching XPath, or ''."""
+    for xpath in xpaths:
+        found = xpath(tree)
+        if found:
+            return str(found[0])
+    return ""
+
+
+# Takes HTML (bytes are decoded by libxml2 from the charset argument or the
+# page's own <meta charset>). Walks the lxml tree directly. Returns
+# (title, metadata dict, content text).
+def _lxml_page_parts(html: Union[str, bytes], encoding: Optional[str]) -> Tuple[str, dict, str]:
+    """Extract title, metadata, and main text with lxml."""
+    try:
+        if isinstance(html, bytes):
+            parser = lxml_html.HTMLParser(encoding=encoding) if encoding else None
+            tree = lxml_html.document_fromstring(html, parser=parser)
+        else:
+            tree = lxml_html.document_fromstring(html)
+    except (etree.ParserError, LookupError, ValueError):
+        return "No title", {}, ""
+
+    etree.strip_elements(tree, *_BOILERPLATE_TAGS, with_tail=False)
+
+    title_text = _TITLE_XPATH(tree).strip() or "No title"
+
+    metadata = {}
+    author = _first_match(tree, _AUTHOR_META_XPATHS)
+    if author:
+        metadata["author"] = author
+    date = _first_match(tree, _DATE_META_XPATHS)
+    if date:
+        metadata["date"] = date[:10]
+    description = _first_match(tree, _DESC_META_XPATHS)
+    if description:
+        metadata["description"] = description[:200]
+
+    main_content = next(
+        (found[0] for found in (xpath(tree) for xpath in _MAIN_CONTENT_XPATHS) if found), None
+    )
+
+    if main_content is not None:
+        content = _element_text(main_content)
+    else:
+        paragraphs = (p.text_content().strip() for p in tree.iter('p'))
+        content = '\n'.join(p for p in paragraphs if p)
+
+    if not content:
+        body = tree.find('body')
+        if body is not None:
+            content = _element_text(body)
+
+    return title_text, metadata, content
+
+
+# Takes HTML. BeautifulSoup fallback for when lxml is not installed.
+# Returns (title, metadata dict, content text).
+def _soup_page_parts(html: Union[str, bytes], encoding: Optional[str]) -> Tuple[str, dict, str]:
+    """Extract title, metadata, and main text with BeautifulSoup."""
+    soup = BeautifulSoup(html, HTML_PARSER, parse_only=_CONTENT_STRAINER, from_encoding=encoding)
+
+    for element in soup(list(_BOILERPLATE_TAGS)):
         element.decompose()
 
     title = soup.find('title')
@@ -139,8 +376,17 @@ def _extract_html_content(html: str, url: str) -> str:
         if body:
             content = body.get_text(separator='\n', strip=True)
 
-    lines = [line.strip() for line in content.split('\n') if line.strip()]
-    content = '\n'.join(lines)
+    return title_text, metadata, content
+
+
+# Strips navigation/scripts, finds main content area, and extracts clean text.
+# Returns title, metadata, and body content.
+def _extract_html_content(html: Union[str, bytes], url: str, encoding: Optional[str] = None) -> str:
+    """Extract readable content from HTML."""
+    page_parts = _lxml_page_parts if HTML_PARSER == "lxml" else _soup_page_parts
+    title_text, metadata, content = page_parts(html, encoding)
+
+    content = _LINE_BREAK_RE.sub('\n', content).strip()
 
     if len(content) > MAX_CONTENT_CHARS:
         content = content[:MAX_CONTENT_CHARS] + "\n\n[Content truncated - page too long]"
@@ -162,6 +408,61 @@ def _extract_html_content(html: str, url: str) -> str:
     return "\n".join(result_parts)
 
 
+# Takes a plain-text, JSON, or XML body. These need no DOM, so the text is
+# returned as-is (truncated) without building a BeautifulSoup tree.
+def _extract_plain_content(text: str, url: str) -> str:
+    """Return a non-HTML text body, truncated to MAX_CONTENT_CHARS."""
+    text = text.strip()
+    if not text:
+        return f"Could not extract text content from {url}. The response body is empty."
+
+    if len(text) > MAX_CONTENT_CHARS:
+        text = text[:MAX_CONTENT_CHARS] + "\n\n[Content truncated]"
+
+    return f"**Content:**\n{text}"
+
+
+# Takes a lowercased Content-Type. Returns True for text bodies that are not
+# HTML (text/plain, JSON, XML); XHTML still goes through the HTML extractor.
+def _is_plain_text(content_type: str) -> bool:
+    """Whether a response can skip HTML parsing."""
+    if "html" in content_type:
+        return False
+    return content_type.startswith("text/plain") or "json" in content_type or "xml" in content_type
+
+
+# Media types that cannot be read as text. fetch_url bails out on these
+# before reading the body, rather than streaming bytes into the HTML parser.
+_BINARY_TYPE_PREFIXES = ("image/", "audio/", "video/", "font/")
+_BINARY_TYPES = ("application/octet-stream", "application/zip", "application/gzip")
+
+
+# Takes a lowercased Content-Type header. Returns True for binary media.
+def _is_binary(content_type: str) -> bool:
+    """Whether a response body is binary media with no text to extract."""
+    return content_type.startswith(_BINARY_TYPE_PREFIXES) or content_type.startswith(_BINARY_TYPES)
+
+
+# Takes an open aiohttp response. Streams at most HTML_MAX_BYTES of the body
+# (far more markup than MAX_CONTENT_CHARS of text needs) and stops, so huge
+# pages cost neither bandwidth nor parse time. Returns the raw bytes.
+async def _read_body(resp) -> bytes:
+    """Read up to HTML_MAX_BYTES of a response body."""
+    buf = bytearray()
+    async for chunk in resp.content.iter_chunked(HTTP_STREAM_CHUNK_SIZE):
+        buf += chunk
+        if len(buf) >= HTML_MAX_BYTES:
+            break
+    return bytes(buf[:HTML_MAX_BYTES])
+
+
+# Takes an open aiohttp response. Returns its capped body decoded with the
+# charset from Content-Type, or UTF-8.
+async def _read_text(resp) -> str:
+    """Read up to HTML_MAX_BYTES of a response body as text."""
+    return (await _read_body(resp)).decode(resp.charset or "utf-8", errors="replace")
+
+
 # Takes a URL string. Fetches the page and routes to PDF or HTML extraction.
 # Returns the extracted text content with title and metadata.
 @safe_tool_call("fetching URL")
@@ -190,20 +491,46 @@ async def fetch_url(url: str) -> str:
     if err:
         return err
 
+    cached = _cache.get(url)
+    if cached is not None and time.time() - cached["fetched_at"] < DEFAULT_CACHE_TTL:
+        return cached["result"]
+
     headers = {"User-Agent": DEFAULT_USER_AGENT}
+    if cached is not None:
+        # Stale: ask the server whether the page changed since we parsed it
+        headers.update(cached["validators"])
 
     session = await get_aiohttp_session()
     async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=DEFAULT_HTTP_TIMEOUT)) as resp:
+        if resp.status == 304 and cached is not None:
+            _cache.set(url, {**cached, "fetched_at": time.time()})
+            return cached["result"]
+
         resp.raise_for_status()
 
         content_type = resp.headers.get("Content-Type", "").lower()
 
         if "application/pdf" in content_type or url.lower().endswith(".pdf"):
             content_bytes = await resp.read()
-            return _extract_pdf_content(content_bytes, url)
+            result = await _extract_pdf_content_parallel(content_bytes, url)
+        elif _is_binary(content_type):
+            return f"Error: {url} is not a web page ({content_type.split(';')[0]}). fetch_url reads HTML, text, and PDF."
+        elif _is_plain_text(content_type):
+            result = _extract_plain_content(await _read_text(resp), url)
         else:
-            html_text = await resp.text()
-            return _extract_html_content(html_text, url)
+            # Hand the parser bytes: without a charset header it reads the
+            # page's own <meta charset> instead of us guessing UTF-8
+            result = _extract_html_content(await _read_body(resp), url, resp.charset)
+
+        validators = {}
+        if resp.headers.get("ETag"):
+            validators["If-None-Match"] = resp.headers["ETag"]
+        if resp.headers.get("Last-Modified"):
+            validators["If-Modified-Since"] = resp.headers["Last-Modified"]
+
+    if not result.startswith(_UNCACHEABLE_PREFIXES):
+        _cache.set(url, {"fetched_at": time.time(), "validators": validators, "result": result})
+    return result
 
 
 url_tool = tool(fetch_url)
@@ -2,15 +2,14 @@
 
 import os
 import json
+from itertools import cycle, islice
 from typing import Type, Literal
 from datetime import datetime
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import numpy as np
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
-from src.constants import CHART_FIGSIZE, CHART_DPI
+from src.constants import CHART_FIGSIZE, CHART_DPI, CHART_MAX_DPI, CHART_FORMATS
+from src.utils import json_loads
 
 # ─── Module overview ───────────────────────────────────────────────
 # Generates matplotlib charts (bar, line, pie, scatter, histogram,
@@ -33,6 +32,12 @@ VALID_CHART_TYPES = [
     "scatter", "histogram", "box", "violin", "heatmap", "function",
 ]
 
+# Extra savefig arguments per format. zlib level 1 encodes PNGs several
+# times faster than the default 6 for files only ~20% larger.
+_SAVE_KWARGS = {
+    "png": {"pil_kwargs": {"compress_level": 1}},
+}
+
 # Safe namespace for evaluating function expressions
 _FUNC_NAMESPACE = {
     "x": None,  # placeholder, replaced at eval time
@@ -46,21 +51,39 @@ _FUNC_NAMESPACE = {
 }
 
 
+# matplotlib (Figure, FigureCanvasAgg), imported on the first chart: it is
+# the slowest import in the agent and most sessions never draw a chart
+_matplotlib_classes = None
+
+
+# Returns the (Figure, FigureCanvasAgg) classes, importing matplotlib once.
+def _load_matplotlib() -> tuple:
+    """Import the matplotlib classes used for rendering, once per process."""
+    global _matplotlib_classes
+    if _matplotlib_classes is None:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        _matplotlib_classes = (Figure, FigureCanvasAgg)
+    return _matplotlib_classes
+
+
+# One syscall in the common already-exists case. Called per chart rather than
+# at import so importing the tool creates nothing on disk.
 def ensure_output_dir():
-    if not os.path.exists(OUTPUT_DIR):
-        os.makedirs(OUTPUT_DIR)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 
+# Takes a palette name and a count. Returns count colors, repeating the
+# palette as needed; unknown palettes fall back to "default".
 def get_colors(palette: str, count: int) -> list:
-    colors = COLOR_PALETTES.get(palette, COLOR_PALETTES["default"])
-    return [colors[i % len(colors)] for i in range(count)]
+    return list(islice(cycle(COLOR_PALETTES.get(palette, COLOR_PALETTES["default"])), count))
 
 
 # Takes a spec dict with chart_type, data, title, palette, etc.
-# Renders the chart via matplotlib and saves as PNG to output/.
+# Renders the chart via matplotlib and saves it (PNG by default) to output/.
 # Returns a success message with filepath or an error string.
 def _generate_chart_from_spec(spec: dict) -> str:
-    """Generate a chart from a spec dict and save as PNG."""
+    """Generate a chart from a spec dict and save it as an image."""
     chart_type = spec.get("chart_type", "bar").lower()
     if chart_type not in VALID_CHART_TYPES:
         return f"Error: Unknown chart_type '{chart_type}'. Options: {', '.join(VALID_CHART_TYPES)}"
@@ -75,13 +98,26 @@ def _generate_chart_from_spec(spec: dict) -> str:
     show_legend = spec.get("legend", True)
     single_color = spec.get("color")
 
+    image_format = str(spec.get("format") or "png").lower().replace("jpeg", "jpg")
+    if image_format not in CHART_FORMATS:
+        return f"Error: Unknown format '{image_format}'. Options: {', '.join(CHART_FORMATS)}"
+    try:
+        dpi = min(max(int(spec.get("dpi") or CHART_DPI), 50), CHART_MAX_DPI)
+    except (TypeError, ValueError):
+        return f"Error: 'dpi' must be a number (50-{CHART_MAX_DPI})."
+
     # Validate data keys
     validation_error = _validate_data(chart_type, data)
     if validation_error:
         return validation_error
 
     try:
-        fig, ax = plt.subplots(figsize=CHART_FIGSIZE)
+        Figure, FigureCanvasAgg = _load_matplotlib()
+        # Figure + Agg canvas directly: no pyplot figure registry or global
+        # state, and nothing to close afterwards
+        fig = Figure(figsize=CHART_FIGSIZE)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
         error_data = data.get("error")
 
         # --- Bar chart ---
@@ -136,16 +172,15 @@ def _generate_chart_from_spec(spec: dict) -> str:
         # Save
         ensure_output_dir()
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"chart_{chart_type}_{timestamp}.png"
+        filename = f"chart_{chart_type}_{timestamp}.{image_format}"
         filepath = os.path.join(OUTPUT_DIR, filename)
-        plt.tight_layout()
-        plt.savefig(filepath, dpi=CHART_DPI, bbox_inches='tight', facecolor='white')
-        plt.close(fig)
+        fig.tight_layout()
+        fig.savefig(filepath, format=image_format, dpi=dpi, bbox_inches='tight',
+                    facecolor='white', **_SAVE_KWARGS.get(image_format, {}))
 
         return f"Chart saved successfully!\nFile: {filepath}\nType: {chart_type}\nTitle: {title}"
 
     except Exception as e:
-        plt.close('all')
         return f"Error generating chart: {str(e)}"
 
 
@@ -160,6 +195,14 @@ def _validate_data(chart_type: str, data: dict) -> str | None:
     if chart_type in ("bar", "stacked_bar", "line", "area"):
         if "series" not in data and ("labels" not in data or "values" not in data):
             return f"Error: {chart_type} charts need 'labels' and 'values' in data, or a 'series' array."
+        if "series" in data:
+            if "labels" not in data:
+                return f"Error: {chart_type} charts with 'series' need 'labels' in data."
+            for series in data["series"]:
+                count = len(series.get("values", ()))
+                if count != len(data["labels"]):
+                    return (f"Error: series '{series.get('name', '')}' has {count} values but there are "
+                            f"{len(data['labels'])} labels; each series needs one value per label.")
     elif chart_type == "pie":
         if "labels" not in data or "values" not in data:
             return "Error: Pie charts need 'labels' and 'values' in data."
@@ -185,18 +228,27 @@ def _validate_data(chart_type: str, data: dict) -> str | None:
 # Individual chart drawing functions
 # ---------------------------------------------------------------------------
 
+# Takes a list of series dicts. Returns their values as one 2-D float array
+# (one row per series), converted once rather than per matplotlib call.
+def _series_values(series_list: list) -> np.ndarray:
+    """Stack every series' values into a (series x labels) float array."""
+    return np.asarray([s["values"] for s in series_list], dtype=np.float64)
+
+
 # Renders a bar chart (single or grouped series) with optional error bars.
 def _draw_bar(ax, data, spec, palette, single_color, show_legend, error_data):
     if "series" in data:
         labels = data["labels"]
+        n = len(data["series"])
         x = np.arange(len(labels))
-        width = 0.8 / len(data["series"])
-        colors = get_colors(palette, len(data["series"]))
+        width = 0.8 / n
+        offsets = (np.arange(n) - n / 2 + 0.5) * width
+        values = _series_values(data["series"])
+        colors = get_colors(palette, n)
         for i, series in enumerate(data["series"]):
-            offset = (i - len(data["series"]) / 2 + 0.5) * width
             color = single_color if single_color else colors[i]
             yerr = series.get("error") if series.get("error") else None
-            ax.bar(x + offset, series["values"], width, label=series["name"],
+            ax.bar(x + offsets[i], values[i], width, label=series["name"],
                    color=color, yerr=yerr, capsize=3 if yerr else 0)
         ax.set_xticks(x)
         ax.set_xticklabels(labels)
@@ -217,11 +269,12 @@ def _draw_stacked_bar(ax, data, spec, palette, single_color, show_legend):
         return _draw_bar(ax, data, spec, palette, single_color, show_legend, None)
     labels = data["labels"]
     colors = get_colors(palette, len(data["series"]))
-    bottom = np.zeros(len(labels))
+    values = _series_values(data["series"])
+    # Each series sits on the running total of the ones before it
+    bottoms = np.vstack([np.zeros(len(labels)), np.cumsum(values, axis=0)[:-1]])
     for i, series in enumerate(data["series"]):
         color = single_color if single_color else colors[i]
-        ax.bar(labels, series["values"], label=series["name"], color=color, bottom=bottom)
-        bottom += np.array(series["values"])
+        ax.bar(labels, values[i], label=series["name"], color=color, bottom=bottoms[i])
     if show_legend:
         ax.legend()
     ax.set_xlabel(spec.get("xlabel", ""))
@@ -256,21 +309,24 @@ def _draw_line(ax, data, spec, palette, single_color, show_legend, error_data):
 # Renders a filled area chart (single or multi-series).
 def _draw_area(ax, data, spec, palette, single_color, show_legend):
     labels = data["labels"]
+    x = np.arange(len(labels))
     if "series" in data:
         colors = get_colors(palette, len(data["series"]))
+        values = _series_values(data["series"])
         for i, series in enumerate(data["series"]):
             color = single_color if single_color else colors[i]
-            ax.fill_between(range(len(labels)), series["values"], alpha=0.5, label=series["name"], color=color)
-            ax.plot(range(len(labels)), series["values"], color=color)
-        ax.set_xticks(range(len(labels)))
+            ax.fill_between(x, values[i], alpha=0.5, label=series["name"], color=color)
+            ax.plot(x, values[i], color=color)
+        ax.set_xticks(x)
         ax.set_xticklabels(labels)
         if show_legend:
             ax.legend()
     else:
         color = single_color if single_color else get_colors(palette, 1)[0]
-        ax.fill_between(range(len(labels)), data["values"], alpha=0.5, color=color)
-        ax.plot(range(len(labels)), data["values"], color=color)
-        ax.set_xticks(range(len(labels)))
+        values = np.asarray(data["values"], dtype=np.float64)
+        ax.fill_between(x, values, alpha=0.5, color=color)
+        ax.plot(x, values, color=color)
+        ax.set_xticks(x)
         ax.set_xticklabels(labels)
     ax.set_xlabel(spec.get("xlabel", ""))
     ax.set_ylabel(spec.get("ylabel", ""))
@@ -431,16 +487,19 @@ class ChartInput(BaseModel):
     palette: str = Field(default="default", description="Color palette: default/warm/cool/pastel")
     grid: bool = Field(default=True, description="Show grid lines")
     legend: bool = Field(default=True, description="Show legend")
+    dpi: int = Field(default=CHART_DPI, ge=50, le=CHART_MAX_DPI, description="Image resolution in dots per inch")
+    format: Literal["png", "jpg", "webp"] = Field(default="png", description="Image format")
 
 
 class VisualizationTool(BaseTool):
     name: str = "create_chart"
     description: str = (
-        "Generate charts and graphs from data. Saves PNG images to output/ folder. "
+        "Generate charts and graphs from data. Saves images (PNG by default) to output/ folder. "
         "\n\nCHART TYPES: bar, stacked_bar, line, area, pie, scatter, histogram, box, violin, heatmap, function"
         "\n\nBASIC FORMAT:"
         '\n{"chart_type": "bar", "title": "My Chart", "data": {"labels": ["A", "B"], "values": [10, 20]}}'
-        "\n\nOPTIONS: xlabel, ylabel, color, palette (default/warm/cool/pastel), grid, legend"
+        "\n\nOPTIONS: xlabel, ylabel, color, palette (default/warm/cool/pastel), grid, legend, "
+        "dpi (50-300, default 100), format (png/jpg/webp; jpg/webp are smaller)"
         "\n\nERROR BARS: Add \"error\": [1, 2] to data (works on bar and line charts)"
         "\n\nMULTIPLE SERIES: {\"data\": {\"labels\": [...], \"series\": [{\"name\": \"A\", \"values\": [...]}]}}"
         "\n\nBOX/VIOLIN: {\"data\": {\"series\": [{\"name\": \"Group A\", \"values\": [1,2,3,4]}]}}"
@@ -453,9 +512,11 @@ class VisualizationTool(BaseTool):
     # Takes chart parameters, builds a spec dict, and delegates to _generate_chart_from_spec.
     # Returns the chart filepath or error message.
     def _run(self, chart_type: str = "bar", data: dict = None, title: str = "",
-             palette: str = "default", grid: bool = True, legend: bool = True) -> str:
+             palette: str = "default", grid: bool = True, legend: bool = True,
+             dpi: int = CHART_DPI, format: str = "png") -> str:
         spec = {"chart_type": chart_type, "data": data or {}, "title": title,
-                "palette": palette, "grid": grid, "legend": legend}
+                "palette": palette, "grid": grid, "legend": legend,
+                "dpi": dpi, "format": format}
         return _generate_chart_from_spec(spec)
 
     async def _arun(self, **kwargs) -> str:
@@ -469,7 +530,7 @@ visualization_tool = VisualizationTool()
 def generate_chart(input_str: str) -> str:
     """Parse a JSON string and generate a chart. Used by tests and CLI."""
     try:
-        spec = json.loads(input_str)
+        spec = json_loads(input_str)
     except (json.JSONDecodeError, TypeError):
         return f"Error: Invalid JSON input. Provide a JSON object with chart_type and data."
     return _generate_chart_from_spec(spec)
@@ -2,11 +2,16 @@
 
 import os
 import asyncio
-from typing import Type, Literal, Optional
+from datetime import datetime, timezone
+from typing import Type, Literal, Optional, Tuple
 import aiohttp
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
-from src.utils import async_retry_on_error, get_aiohttp_session, safe_tool_call
+from src.utils import (
+    async_retry_on_error, get_aiohttp_session, safe_tool_call, TTLCache, json_loads,
+    circuit_breaker, bulkhead,
+)
+from src.constants import WEATHER_CACHE_TTL, OPENWEATHER_MAX_CONCURRENCY
 
 # ─── Module overview ───────────────────────────────────────────────
 # Fetches current weather and multi-day forecasts from the
@@ -14,8 +19,12 @@ from src.utils import async_retry_on_error, get_aiohttp_session, safe_tool_call
 # ───────────────────────────────────────────────────────────────────
 
 # API endpoints
-CURRENT_WEATHER_URL = "http://api.openweathermap.org/data/2.5/weather"
-FORECAST_URL = "http://api.openweathermap.org/data/2.5/forecast"
+CURRENT_WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+FORECAST_URL = "https://api.openweathermap.org/data/2.5/forecast"
+
+# Formatted reports by request. OpenWeatherMap only updates every ~10
+# minutes, so a repeat lookup within that window skips the API entirely.
+_cache = TTLCache(ttl=WEATHER_CACHE_TTL)
 
 
 # Formats an OpenWeatherMap current-weather response into a readable string.
@@ -43,20 +52,8 @@ def _format_current_weather(data: dict, units: str) -> str:
     )
 
 
-def _extract_hour(dt_txt: str) -> int:
-    """Extract the hour from an OpenWeatherMap dt_txt string."""
-    try:
-        return int(dt_txt.split(" ")[1].split(":")[0])
-    except (IndexError, ValueError):
-        return 0
-
-
-def _is_closer_to_noon(candidate_hour: int, current_best_hour: int) -> bool:
-    """Return True if candidate_hour is closer to 12:00 than current_best_hour."""
-    return abs(candidate_hour - 12) < abs(current_best_hour - 12)
-
-
-# Picks the closest-to-noon entry per day and formats a multi-day summary.
+# Summarizes each day (range over all entries, conditions from the one
+# closest to noon) and formats a multi-day summary.
 def _format_forecast(data: dict, units: str, days: int = 3) -> str:
     """Format forecast API response into a readable multi-day summary."""
     temp_unit = "\u00b0C" if units == "metric" else "\u00b0F"
@@ -65,46 +62,73 @@ def _format_forecast(data: dict, units: str, days: int = 3) -> str:
     city_name = city.get("name", "Unknown")
     country = city.get("country", "")
 
-    daily_forecasts = {}
+    # Day number -> [noon distance, entry closest to noon, low, high]. One
+    # pass over the 3-hour entries: each day's range spans all of its entries
+    # (a single entry's temp_min/temp_max only covers its own 3 hours), and
+    # the conditions come from the entry nearest 12:00 UTC. The UTC "dt"
+    # timestamp is bucketed with integer arithmetic.
+    daily = {}
     for item in data.get("list", []):
-        dt_txt = item.get("dt_txt", "")
-        date = dt_txt.split(" ")[0] if " " in dt_txt else dt_txt
-        hour = _extract_hour(dt_txt)
-
-        if date not in daily_forecasts or _is_closer_to_noon(hour, _extract_hour(daily_forecasts[date].get("dt_txt", ""))):
-            daily_forecasts[date] = item
+        ts = item.get("dt")
+        if ts is None:
+            continue
+        day, seconds = divmod(int(ts), 86400)
+        noon_distance = abs(seconds // 3600 - 12)
+        main = item.get("main", {})
+        low = main.get("temp_min", main.get("temp", 0))
+        high = main.get("temp_max", main.get("temp", 0))
+
+        entry = daily.get(day)
+        if entry is None:
+            daily[day] = [noon_distance, item, low, high]
+            continue
+        if noon_distance < entry[0]:
+            entry[0], entry[1] = noon_distance, item
+        entry[2] = min(entry[2], low)
+        entry[3] = max(entry[3], high)
 
     result_parts = [f"**{days}-day forecast for {city_name}, {country}:**\n"]
 
-    count = 0
-    for date, item in sorted(daily_forecasts.items()):
-        if count >= days:
-            break
+    for day, (_, item, low, high) in sorted(daily.items())[:days]:
+        date = datetime.fromtimestamp(day * 86400, timezone.utc).strftime("%Y-%m-%d")
 
         weather_list = item.get("weather", [{}])
         weather_desc = weather_list[0].get("description", "Unknown") if weather_list else "Unknown"
-        main = item.get("main", {})
-        temp = main.get("temp", 0)
-        temp_min = main.get("temp_min", 0)
-        temp_max = main.get("temp_max", 0)
+        temp = item.get("main", {}).get("temp", 0)
 
         result_parts.append(
             f"{date}: {weather_desc.capitalize()}, "
-            f"{temp_min:.0f}-{temp_max:.0f}{temp_unit} (avg {temp:.0f}{temp_unit})"
+            f"{low:.0f}-{high:.0f}{temp_unit} (avg {temp:.0f}{temp_unit})"
         )
-        count += 1
 
     return "\n".join(result_parts)
 
 
-# Takes location (city or lat/lon), units, and forecast flag.
-# Calls the OpenWeatherMap API and returns formatted weather data.
-@safe_tool_call("getting weather")
+# Takes (url, params). Calls the OpenWeatherMap API behind the "openweather"
+# circuit breaker. Returns (HTTP status, parsed JSON body); 4xx bodies carry
+# the API's error message, 5xx responses raise and count against the breaker.
+@circuit_breaker("openweather")
 @async_retry_on_error(
-    max_retries=2,
-    delay=1.0,
+    max_retries=3,
+    delay=0.5,
     exceptions=(aiohttp.ClientError, asyncio.TimeoutError)
 )
+@bulkhead(OPENWEATHER_MAX_CONCURRENCY)
+async def _fetch_weather(url: str, params: dict) -> Tuple[int, dict]:
+    """Fetch one OpenWeatherMap endpoint."""
+    session = await get_aiohttp_session()
+    async with session.get(
+        url, params=params,
+        timeout=aiohttp.ClientTimeout(total=10),
+    ) as resp:
+        if resp.status >= 500:
+            resp.raise_for_status()
+        return resp.status, await resp.json(loads=json_loads)
+
+
+# Takes location (city or lat/lon), units, and forecast flag.
+# Calls the OpenWeatherMap API and returns formatted weather data.
+@safe_tool_call("getting weather")
 async def _get_weather(location: str = "", lat: float = None, lon: float = None,
                        units: str = "metric", forecast: bool = False, days: int = 3) -> str:
     """Core async weather logic."""
@@ -135,19 +159,27 @@ async def _get_weather(location: str = "", lat: float = None, lon: float = None,
     else:
         return "Error: Provide a location (city name) or coordinates (lat/lon)."
 
-    session = await get_aiohttp_session()
+    # City names are matched case-insensitively by the API, so by the cache too
+    cache_key = _cache.make_key(
+        params.get("q", "").strip().lower(), lat, lon, units, forecast,
+        forecast_days if forecast else None,
+    )
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     url = FORECAST_URL if forecast else CURRENT_WEATHER_URL
-    async with session.get(
-        url, params=params,
-        timeout=aiohttp.ClientTimeout(total=10),
-    ) as resp:
-        data = await resp.json()
-        if resp.status != 200:
-            return f"Weather API error: {data.get('message', 'Unknown error')}"
+    status, data = await _fetch_weather(url, params)
+    if status != 200:
+        return f"Weather API error: {data.get('message', 'Unknown error')}"
+
+    if forecast:
+        result = _format_forecast(data, units, forecast_days)
+    else:
+        result = _format_current_weather(data, units)
 
-        if forecast:
-            return _format_forecast(data, units, forecast_days)
-        return _format_current_weather(data, units)
+    _cache.set(cache_key, result)
+    return result
 
 
 # ---------------------------------------------------------------------------
@@ -1,16 +1,19 @@
 """Wikipedia lookup tool."""
 
 import asyncio
-from typing import Type
+import re
+from typing import Optional, Tuple, Type
 
-import wikipedia as _wikipedia_lib
 from langchain_core.tools import BaseTool
 from pydantic import BaseModel, Field
 
 from src.utils import (
-    async_run_with_timeout, truncate, safe_tool_call, require_input,
+    async_run_with_timeout, truncate, safe_tool_call, require_input, TTLCache,
+    circuit_breaker,
+)
+from src.constants import (
+    DEFAULT_SEARCH_TIMEOUT, WIKI_MAX_CHARS, REFERENCE_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES,
 )
-from src.constants import DEFAULT_SEARCH_TIMEOUT, WIKI_MAX_CHARS
 
 # ─── Module overview ───────────────────────────────────────────────
 # Looks up Wikipedia article summaries and search results using the
@@ -20,6 +23,29 @@ from src.constants import DEFAULT_SEARCH_TIMEOUT, WIKI_MAX_CHARS
 DEFAULT_SENTENCES = 5  # Number of sentences in summary
 MAX_RESULTS = 5        # Upper bound when listing multiple results
 
+# Whitespace following sentence-ending punctuation
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?])\s+")
+
+# Formatted answers by (query, sentences, suggestion, results). Only complete
+# answers are cached: failed lookups raise (reported by safe_tool_call), and a
+# listing with an entry that hit a network error is returned uncached so the
+# next call retries it.
+_cache = TTLCache(ttl=REFERENCE_CACHE_TTL, maxsize=SEARCH_CACHE_MAX_ENTRIES)
+
+# The wikipedia library (and the requests/BeautifulSoup stack under it) is
+# imported on first lookup, so sessions that never use this tool skip it
+_wikipedia_lib = None
+
+
+# Returns the wikipedia module, importing it once per process.
+def _load_wikipedia():
+    """Import the wikipedia library on first use."""
+    global _wikipedia_lib
+    if _wikipedia_lib is None:
+        import wikipedia
+        _wikipedia_lib = wikipedia
+    return _wikipedia_lib
+
 
 # Takes (query, sentences, suggestion, results). Returns article summary
 # with title/URL, or multiple search results when results > 1.
@@ -35,63 +61,117 @@ async def wikipedia(
     if err:
         return err
 
+    query = query.strip()
     results = min(int(results), MAX_RESULTS)
 
+    cache_key = _cache.make_key(query, sentences, suggestion, results)
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    result, complete = await _lookup(query, sentences, suggestion, results)
+    if complete:
+        _cache.set(cache_key, result)
+    return result
+
+
+# Takes (text, count). Returns the text up to the end of its count-th
+# sentence, keeping paragraph breaks, or all of it if it is shorter.
+def _first_sentences(text: str, count: int) -> str:
+    """Cut text after its first count sentences."""
+    for i, match in enumerate(_SENTENCE_BREAK_RE.finditer(text), 1):
+        if i == count:
+            return text[:match.start()]
+    return text
+
+
+# Takes a result number and article title. Loads the page and its intro.
+# Never raises: failures become a note on that entry, so one bad result
+# doesn't abort the whole listing. Returns (formatted entry, the unexpected
+# error if one occurred); missing and ambiguous pages are answers, not errors.
+async def _describe_result(i: int, title: str) -> Tuple[str, Optional[Exception]]:
+    """Format one entry of a multi-result listing."""
+    wiki = _load_wikipedia()
+    try:
+        # One page load plus its intro extract; wikipedia.summary()
+        # would load the same page a second time
+        page = await async_run_with_timeout(
+            lambda: wiki.page(title, auto_suggest=False),
+            timeout=DEFAULT_SEARCH_TIMEOUT,
+        )
+        intro = await async_run_with_timeout(
+            lambda: page.summary,
+            timeout=DEFAULT_SEARCH_TIMEOUT,
+        )
+        summary = truncate(_first_sentences(intro, 2), 200)
+        return f"{i}. **{page.title}**\n   {summary}", None
+    except wiki.exceptions.DisambiguationError as e:
+        return f"{i}. **{title}** (disambiguation page with {len(e.options)} options)", None
+    except wiki.exceptions.PageError:
+        return f"{i}. **{title}** (page not found)", None
+    except Exception as e:
+        # Catch unexpected errors (network, parsing) so one failed
+        # result doesn't abort the entire multi-result search.
+        return f"{i}. **{title}** (error: {str(e)[:80]})", e
+
+
+# Takes (query, sentences, suggestion, results) already validated. Does the
+# actual lookups for wikipedia(), behind the "wikipedia" circuit breaker
+# (missing or ambiguous pages are answers, not failures). A listing whose
+# entries all failed raises the first error, so an outage counts against the
+# breaker. Returns (formatted answer, whether it is complete and cacheable).
+@circuit_breaker("wikipedia")
+async def _lookup(query: str, sentences: int, suggestion: bool, results: int) -> Tuple[str, bool]:
+    """Fetch and format a Wikipedia summary or result list."""
+    wiki = _load_wikipedia()
     if results > 1:
         # Return multiple search results (titles only, for disambiguation).
         # The wikipedia library has no timeout parameter, so we wrap the call.
         search_results = await async_run_with_timeout(
-            lambda: _wikipedia_lib.search(query, results=results),
+            lambda: wiki.search(query, results=results),
             timeout=DEFAULT_SEARCH_TIMEOUT,
         )
 
         if not search_results:
-            return f"No Wikipedia articles found for '{query}'"
+            return f"No Wikipedia articles found for '{query}'", True
 
         result_parts = [f"Found {len(search_results)} Wikipedia articles for '{query}':\n"]
 
-        for i, title in enumerate(search_results, 1):
-            try:
-                page = await async_run_with_timeout(
-                    lambda t=title: _wikipedia_lib.page(t, auto_suggest=False),
-                    timeout=DEFAULT_SEARCH_TIMEOUT,
-                )
-                summary = await async_run_with_timeout(
-                    lambda t=title: _wikipedia_lib.summary(t, sentences=2, auto_suggest=False),
-                    timeout=DEFAULT_SEARCH_TIMEOUT,
-                )
-                summary = truncate(summary, 200)
-                result_parts.append(f"{i}. **{page.title}**\n   {summary}")
-            except _wikipedia_lib.exceptions.DisambiguationError as e:
-                result_parts.append(f"{i}. **{title}** (disambiguation page with {len(e.options)} options)")
-            except _wikipedia_lib.exceptions.PageError:
-                result_parts.append(f"{i}. **{title}** (page not found)")
-            except Exception as e:
-                # Catch unexpected errors (network, parsing) so one failed
-                # result doesn't abort the entire multi-result search.
-                result_parts.append(f"{i}. **{title}** (error: {str(e)[:80]})")
-
-        return "\n\n".join(result_parts)
+        # Each entry is independent network I/O, so all of them are fetched
+        # concurrently: the listing takes the slowest lookup, not the sum
+        entries = await asyncio.gather(
+            *(_describe_result(i, title) for i, title in enumerate(search_results, 1))
+        )
+        errors = [error for _, error in entries if error is not None]
+        if len(errors) == len(entries):
+            raise errors[0]
+        result_parts.extend(text for text, _ in entries)
+
+        return "\n\n".join(result_parts), not errors
 
     try:
-        summary = await async_run_with_timeout(
-            lambda: _wikipedia_lib.summary(query, sentences=sentences, auto_suggest=suggestion),
+        # Resolve the page once (title, URL, and disambiguation check) and
+        # take the summary from its intro. Calling wikipedia.summary() as
+        # well would repeat the search and page load, and under auto-suggest
+        # could even resolve to a different article.
+        page = await async_run_with_timeout(
+            lambda: wiki.page(query, auto_suggest=suggestion),
             timeout=DEFAULT_SEARCH_TIMEOUT,
         )
-        page = await async_run_with_timeout(
-            lambda: _wikipedia_lib.page(query, auto_suggest=suggestion),
+        intro = await async_run_with_timeout(
+            lambda: page.summary,
             timeout=DEFAULT_SEARCH_TIMEOUT,
         )
 
-        summary = truncate(summary, WIKI_MAX_CHARS)
+        summary = truncate(_first_sentences(intro, sentences), WIKI_MAX_CHARS)
 
         return (
             f"**{page.title}**\n"
             f"URL: {page.url}\n\n"
             f"{summary}"
-        )
+        ), True
 
-    except _wikipedia_lib.exceptions.DisambiguationError as e:
+    except wiki.exceptions.DisambiguationError as e:
         options = e.options[:10]
         options_list = "\n".join(f"  - {opt}" for opt in options)
 
@@ -99,11 +179,11 @@ async def wikipedia(
             f"'{query}' is ambiguous. Did you mean one of these?\n\n"
             f"{options_list}\n\n"
             f"Try a more specific term, or set results=3 to see multiple summaries."
-        )
+        ), True
 
-    except _wikipedia_lib.exceptions.PageError:
+    except wiki.exceptions.PageError:
         suggestions = await async_run_with_timeout(
-            lambda: _wikipedia_lib.search(query, results=5),
+            lambda: wiki.search(query, results=5),
             timeout=DEFAULT_SEARCH_TIMEOUT,
         )
 
@@ -112,8 +192,8 @@ async def wikipedia(
             return (
                 f"No Wikipedia article found for '{query}'.\n\n"
                 f"Did you mean:\n{suggestions_list}"
-            )
-        return f"No Wikipedia article found for '{query}'. Try different search terms."
+            ), True
+        return f"No Wikipedia article found for '{query}'. Try different search terms.", True
 
 
 class WikipediaInput(BaseModel):
@@ -1,8 +1,13 @@
 """Wolfram Alpha tool — queries the Short Answers API for precise, quantitative data."""
 
+import asyncio
 import aiohttp
 from langchain_core.tools import tool
-from src.utils import async_retry_on_error, async_fetch, safe_tool_call
+from src.utils import (
+    async_retry_on_error, get_aiohttp_session, safe_tool_call, TTLCache, circuit_breaker,
+    bulkhead,
+)
+from src.constants import REFERENCE_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES, WOLFRAM_MAX_CONCURRENCY
 from config import WOLFRAM_ALPHA_APP_ID
 
 # ─── Module overview ───────────────────────────────────────────────
@@ -13,11 +18,54 @@ from config import WOLFRAM_ALPHA_APP_ID
 # Wolfram Alpha Short Answers API endpoint
 WOLFRAM_API_URL = "https://api.wolframalpha.com/v1/result"
 
+# The API's plain-text replies for questions it has no answer to, mapped to
+# the message shown instead (formatted with the query)
+_NO_ANSWER_MESSAGES = {
+    "Wolfram|Alpha did not understand your input": (
+        "Wolfram Alpha couldn't understand: '{query}'. "
+        "Try rephrasing as a simple factual question."
+    ),
+    "No short answer available": (
+        "Wolfram Alpha has data on this but no short answer available. "
+        "Query: '{query}'. Try being more specific."
+    ),
+}
+
+# Answers by normalized query; constants and properties do not change, and
+# each call spends API quota
+_cache = TTLCache(ttl=REFERENCE_CACHE_TTL, maxsize=SEARCH_CACHE_MAX_ENTRIES)
+
+
+# Takes a natural-language query. Calls the Short Answers API behind the
+# "wolfram" circuit breaker. Returns the answer text; for questions it has no
+# answer to, the API replies 501 with one of the _NO_ANSWER_MESSAGES keys as
+# the body, which is returned the same way. Any other HTTP error raises.
+@circuit_breaker("wolfram")
+@async_retry_on_error(max_retries=3, delay=0.5, exceptions=(aiohttp.ClientError, asyncio.TimeoutError))
+@bulkhead(WOLFRAM_MAX_CONCURRENCY)
+async def _fetch_answer(query: str) -> str:
+    """Fetch the short answer for a query."""
+    params = {
+        "appid": WOLFRAM_ALPHA_APP_ID,
+        "i": query
+    }
+
+    session = await get_aiohttp_session()
+    async with session.get(
+        WOLFRAM_API_URL, params=params,
+        timeout=aiohttp.ClientTimeout(total=10),
+    ) as resp:
+        if resp.status != 501:
+            resp.raise_for_status()
+        answer = (await resp.text()).strip()
+        if resp.status == 501 and answer not in _NO_ANSWER_MESSAGES:
+            resp.raise_for_status()
+    return answer
+
 
 # Takes a natural-language query. Sends it to the Wolfram Short Answers API.
 # Returns the short answer string or a descriptive error message.
 @safe_tool_call("querying Wolfram Alpha")
-@async_retry_on_error(max_retries=2, delay=1.0, exceptions=(Exception,))
 async def wolfram_alpha(query: str) -> str:
     """Look up REFERENCE DATA from Wolfram Alpha's knowledge base: physical constants, scientific properties, nutritional data, and measurements that require an external database.
 
@@ -43,29 +91,25 @@ RULE: Need a SCIENTIFIC CONSTANT or PHYSICAL PROPERTY? -> Wolfram. Need ENTITY F
             "Get a free key at: https://developer.wolframalpha.com/"
         )
 
-    params = {
-        "appid": WOLFRAM_ALPHA_APP_ID,
-        "i": query
-    }
+    # Case and spacing never change Wolfram's reading of a question
+    cache_key = _cache.make_key(" ".join(query.lower().split()))
+    cached = _cache.get(cache_key)
+    if cached is not None:
+        return cached
 
-    answer = await async_fetch(
-        WOLFRAM_API_URL, params=params, headers={}, timeout=10,
-        response_type="text",
-    )
-    answer = answer.strip()
+    try:
+        answer = await _fetch_answer(query)
+    except aiohttp.ClientResponseError as e:
+        if e.status == 403:
+            return "Error: Wolfram Alpha rejected the app ID. Check WOLFRAM_ALPHA_APP_ID in your .env file."
+        raise
 
-    if answer == "Wolfram|Alpha did not understand your input":
-        return (
-            f"Wolfram Alpha couldn't understand: '{query}'. "
-            "Try rephrasing as a simple factual question."
-        )
-    elif answer == "No short answer available":
-        return (
-            f"Wolfram Alpha has data on this but no short answer available. "
-            f"Query: '{query}'. Try being more specific."
-        )
-    else:
-        return f"Wolfram Alpha: {answer}"
+    # One dict probe; the common case (a real answer) misses straight away
+    message = _NO_ANSWER_MESSAGES.get(answer)
+    result = message.format(query=query) if message else f"Wolfram Alpha: {answer}"
+
+    _cache.set(cache_key, result)
+    return result
 
 
 wolfram_tool = tool(wolfram_alpha)
@@ -1,5 +1,6 @@
 """YouTube search tool using yt-dlp for reliable video discovery."""
 
+import threading
 from typing import List, Dict
 
 from langchain_core.tools import tool
@@ -7,13 +8,41 @@ from src.utils import (
     async_retry_on_error, async_run_with_timeout,
     parse_result_count, truncate, cached_tool, safe_tool_call, require_input,
 )
-from src.constants import DEFAULT_SEARCH_TIMEOUT, DESCRIPTION_MAX_CHARS
+from src.constants import (
+    DEFAULT_SEARCH_TIMEOUT, DESCRIPTION_MAX_CHARS, REFERENCE_CACHE_TTL, SEARCH_CACHE_MAX_ENTRIES,
+)
 
 # ─── Module overview ───────────────────────────────────────────────
 # Searches YouTube for videos using yt-dlp. Returns titles,
 # channels, durations, view counts, and description snippets.
 # ───────────────────────────────────────────────────────────────────
 
+# yt-dlp options shared by every search; the "ytsearchN:" URL itself bounds
+# the number of entries, so nothing here varies per call
+_YDL_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "skip_download": True,
+    "extract_flat": True,
+}
+
+# One YoutubeDL per worker thread. Building one costs ~50 ms, and a reused
+# instance keeps its HTTP session (and so its keep-alive connections to
+# youtube.com) between searches. YoutubeDL is not thread-safe, hence
+# per-thread rather than shared.
+_ydl_local = threading.local()
+
+
+# Returns this thread's YoutubeDL, creating it on first use.
+def _get_ydl():
+    """Return the calling thread's reusable YoutubeDL instance."""
+    ydl = getattr(_ydl_local, "ydl", None)
+    if ydl is None:
+        import yt_dlp
+        ydl = _ydl_local.ydl = yt_dlp.YoutubeDL(_YDL_OPTS)
+    return ydl
+
+
 def _format_duration(seconds) -> str:
     """Convert seconds to H:MM:SS or MM:SS string."""
     if not seconds:
@@ -41,25 +70,16 @@ def _format_views(count) -> str:
 
 # Takes (query, max_results). Runs yt-dlp ytsearch in a thread with timeout.
 # Returns a list of video metadata dicts (title, url, channel, views, etc.).
-@cached_tool("youtube")
+# Search listings change slowly and each one costs a scrape of youtube.com,
+# so results are kept for an hour, bounded like the web search cache.
+@cached_tool("youtube", ttl=REFERENCE_CACHE_TTL, maxsize=SEARCH_CACHE_MAX_ENTRIES)
 @async_retry_on_error(max_retries=2, delay=1.0)
 async def async_search_youtube_ytdlp(query: str, max_results: int = 5) -> List[Dict]:
     """Search YouTube via yt-dlp's ytsearch protocol asynchronously."""
-    import yt_dlp
-
-    ydl_opts = {
-        "quiet": True,
-        "no_warnings": True,
-        "skip_download": True,
-        "extract_flat": True,
-        "playlist_items": f"1:{max_results}",
-    }
-
     search_url = f"ytsearch{max_results}:{query}"
 
     def _do_search():
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            return ydl.extract_info(search_url, download=False)
+        return _get_ydl().extract_info(search_url, download=False)
 
     data = await async_run_with_timeout(_do_search, timeout=DEFAULT_SEARCH_TIMEOUT)
 
@@ -101,7 +121,8 @@ def format_results(results: List[Dict], query: str) -> str:
             lines.append(f"   Published: {video['published']}")
         lines.append(f"   URL: {video['url']}")
         if video.get("description"):
-            lines.append(f"   Description: {video['description'][:150]}...")
+            # Ellipsis only when something was actually cut off
+            lines.append(f"   Description: {truncate(video['description'], 150)}")
         lines.append("")
 
     return "\n".join(lines)
@@ -134,10 +155,12 @@ USE FOR: Finding tutorials, explanations, lectures, demonstrations, news coverag
     query, max_results = parse_result_count(query)
 
     # Check for "search:" prefix
-    if query.lower().startswith("search:"):
+    if query[:7].lower() == "search:":
         query = query[7:].strip()
 
-    results = await async_search_youtube_ytdlp(query, max_results)
+    # YouTube search ignores case and extra spaces, so normalizing here lets
+    # "Python Tutorial" reuse the cached results of "python  tutorial"
+    results = await async_search_youtube_ytdlp(" ".join(query.lower().split()), max_results)
     return format_results(results, query)
 
 
@@ -1,16 +1,38 @@
 """Shared utility functions: retry, timeout, HTTP, caching, tool helpers."""
 
 import asyncio
+import atexit
+import contextvars
+import email.utils
+import json
+import logging
+import random
 import re
 import time
 import functools
 import hashlib
-from typing import Callable, Any, Dict, List, Optional, Tuple, Type, Union
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Any, Dict, List, Optional, Tuple, Type, Union
 
 import aiohttp
 from langchain_core.messages import AIMessage
 
-from src.constants import DEFAULT_HTTP_TIMEOUT, DEFAULT_HTTP_HEADERS, DEFAULT_CACHE_TTL
+# orjson (C) parses JSON several times faster than the stdlib, but is
+# stricter: it rejects NaN/Infinity and integers beyond 64 bits
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from src.constants import (
+    DEFAULT_HTTP_TIMEOUT, DEFAULT_HTTP_HEADERS, DEFAULT_CACHE_TTL,
+    HTTP_KEEPALIVE_TIMEOUT, HTTP_POOL_LIMIT_PER_HOST, BLOCKING_IO_MAX_WORKERS,
+    HTTP_STREAM_CHUNK_SIZE, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
 
 # ─── Module overview ───────────────────────────────────────────────
 # Shared utilities used across the codebase: retry/timeout wrappers,
@@ -62,15 +84,21 @@ async def _retry_sleep(seconds: float) -> None:
     await asyncio.sleep(seconds)
 
 
-# Takes (max_retries, delay, backoff, exceptions). Returns a decorator that
-# retries an async function with exponential backoff on matching exceptions.
+# Takes (max_retries, delay, backoff, jitter, max_delay, exceptions). Returns
+# a decorator that retries an async function with jittered exponential
+# backoff on matching exceptions. Jitter spreads out the retries of many
+# concurrent callers hitting the same overloaded API; a Retry-After header on
+# a 429/503 response replaces the computed delay. HTTP errors that say the
+# request itself is wrong (4xx other than 429, and 501) are not retried.
 def async_retry_on_error(
     max_retries: int = 3,
     delay: float = 1.0,
     backoff: float = 2.0,
-    exceptions: Tuple[Type[Exception], ...] = (Exception,)
+    exceptions: Tuple[Type[Exception], ...] = (Exception,),
+    jitter: float = 0.5,
+    max_delay: float = 30.0,
 ) -> Callable:
-    """Decorator: retries an async fn with exponential backoff on failure."""
+    """Decorator: retries an async fn with jittered exponential backoff on failure."""
 
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
@@ -85,16 +113,24 @@ def async_retry_on_error(
                 except exceptions as e:
                     last_exception = e
 
+                    if not _is_retryable_status(e):
+                        raise
+
                     if attempt == max_retries:
-                        print(f"  ⚠️  All {max_retries} retries failed for {func.__name__}")
+                        logger.warning("All %d retries failed for %s", max_retries, func.__name__)
                         raise
 
                     is_rate_limited = _is_rate_limit_error(e)
-                    retry_delay = current_delay * 5 if is_rate_limited else current_delay
-                    reason = "rate limited" if is_rate_limited else str(e)[:50]
-
-                    print(f"  🔄 Retry {attempt + 1}/{max_retries} for {func.__name__} "
-                          f"after {reason}...")
+                    retry_delay = _retry_after_seconds(e)
+                    if retry_delay is None:
+                        retry_delay = current_delay * 5 if is_rate_limited else current_delay
+                        retry_delay *= random.uniform(1 - jitter, 1 + jitter)
+                    retry_delay = min(retry_delay, max_delay)
+                    # Lazy %-formatting; the reason is only built if it will be emitted
+                    if logger.isEnabledFor(logging.WARNING):
+                        reason = "rate limited" if is_rate_limited else str(e)[:50]
+                        logger.warning("Retry %d/%d for %s after %s...",
+                                       attempt + 1, max_retries, func.__name__, reason)
 
                     await _retry_sleep(retry_delay)
                     current_delay *= backoff
@@ -105,6 +141,36 @@ def async_retry_on_error(
     return decorator
 
 
+# Takes (error). Errors without an HTTP status (timeouts, dropped
+# connections, ...) are always worth retrying.
+def _is_retryable_status(error: Exception) -> bool:
+    """Returns False for HTTP errors that a retry cannot fix."""
+    status = getattr(error, "status", None)
+    if not isinstance(status, int):
+        return True
+    return status == 429 or (status >= 500 and status != 501)
+
+
+# Takes (error). Returns the delay a 429/503 response asked for via its
+# Retry-After header (delta-seconds or an HTTP date), or None.
+def _retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read Retry-After from an HTTP error, if it carries one."""
+    if getattr(error, "status", None) not in (429, 503):
+        return None
+    value = (getattr(error, "headers", None) or {}).get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
 # Takes (error). Checks status codes and error strings for HTTP 429 indicators.
 def _is_rate_limit_error(error: Exception) -> bool:
     """Returns True if the exception looks like an HTTP 429."""
@@ -116,16 +182,184 @@ def _is_rate_limit_error(error: Exception) -> bool:
     return "429" in error_str or "rate limit" in error_str.lower()
 
 
+# ---------------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------------
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose circuit breaker is open."""
+
+
+# Takes (error). HTTP 4xx responses (and 501, which e.g. Wolfram uses for
+# queries it cannot interpret) are about the request, not the service, so
+# they never trip a breaker.
+def _is_outage_error(error: Exception) -> bool:
+    """Returns True if the exception suggests the service itself is failing."""
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        return status >= 500 and status != 501
+    return True
+
+
+# Every breaker created by circuit_breaker(), by service name
+_breakers: Dict[str, "CircuitBreaker"] = {}
+
+
+class CircuitBreaker:
+    """Per-service breaker: CLOSED -> OPEN after repeated failures -> HALF_OPEN probe.
+
+    While OPEN, calls fail fast with CircuitOpenError instead of waiting on
+    a service that is down (plus its retries). After reset_timeout one probe
+    call is let through; its success closes the breaker, its failure re-opens it.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    # Raises CircuitOpenError if the call must not go through; otherwise
+    # admits it (moving OPEN -> HALF_OPEN once the cooldown has passed).
+    def before_call(self) -> None:
+        """Admit a call or fail fast."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return
+            raise CircuitOpenError(
+                f"{self.name} is temporarily unavailable after repeated failures; "
+                f"try again in {self.reset_timeout:.0f}s or use another tool"
+            )
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        """Count a failure; open the breaker at the threshold or on a failed probe."""
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    # A call that ended without an outcome (cancelled, interrupted) says
+    # nothing about the service, but if it was the HALF_OPEN probe the breaker
+    # would wait on it forever. Re-open with the original cooldown, so the
+    # next call probes again right away.
+    def abandon_call(self) -> None:
+        """Release a probe that was cancelled before it finished."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def reset(self) -> None:
+        """Return to CLOSED with no recorded failures."""
+        self.record_success()
+
+
+# Takes (name, failure_threshold, reset_timeout). Returns a decorator that
+# guards an async fn with a CircuitBreaker. Put it outside the retry decorator
+# so one call's exhausted retries count as one failure.
+def circuit_breaker(
+    name: str,
+    failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+) -> Callable:
+    """Decorator: fails fast while the named service keeps failing."""
+    breaker = CircuitBreaker(name, failure_threshold, reset_timeout)
+    _breakers[name] = breaker
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            breaker.before_call()
+            try:
+                result = await func(*args, **kwargs)
+            except Exception as e:
+                if _is_outage_error(e):
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                raise
+            except BaseException:
+                # e.g. asyncio.CancelledError from a caller's timeout
+                breaker.abandon_call()
+                raise
+            breaker.record_success()
+            return result
+
+        # Expose breaker for test resets
+        wrapper._breaker = breaker
+        return wrapper
+
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# Bulkhead
+# ---------------------------------------------------------------------------
+
+# Takes max_concurrent. Returns a decorator that lets at most that many calls
+# of an async fn run at once; the rest queue. Caps what we send a rate-limited
+# API instead of overrunning it and retrying the 429s. Put it inside the retry
+# decorator so a call waiting out its backoff doesn't hold a slot.
+def bulkhead(max_concurrent: int) -> Callable:
+    """Decorator: limits concurrent calls of an async fn."""
+    # asyncio primitives belong to one event loop, so one semaphore per loop
+    semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+        weakref.WeakKeyDictionary()
+    )
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> Any:
+            loop = asyncio.get_running_loop()
+            semaphore = semaphores.get(loop)
+            if semaphore is None:
+                semaphore = semaphores[loop] = asyncio.Semaphore(max_concurrent)
+            async with semaphore:
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
 # ---------------------------------------------------------------------------
 # Async timeout wrapper
 # ---------------------------------------------------------------------------
 
+# Process-wide pool for blocking library calls. Unlike asyncio.to_thread's
+# per-loop default executor, it survives the short-lived loops created by
+# each BaseTool._run -> asyncio.run, so threads are not respawned per call.
+_BLOCKING_EXECUTOR = ThreadPoolExecutor(
+    max_workers=BLOCKING_IO_MAX_WORKERS,
+    thread_name_prefix="tool_io",
+)
+atexit.register(_BLOCKING_EXECUTOR.shutdown, wait=False)
+
+
 # Takes (func, args, timeout). Runs a blocking function in a thread with a timeout.
 async def async_run_with_timeout(func: Callable, args: tuple = (), timeout: int = 30) -> Any:
     """Runs a blocking func in a thread; raises TimeoutError after *timeout* seconds."""
+    loop = asyncio.get_running_loop()
+    # Copy the caller's context like asyncio.to_thread does
+    ctx = contextvars.copy_context()
     try:
         return await asyncio.wait_for(
-            asyncio.to_thread(func, *args),
+            loop.run_in_executor(_BLOCKING_EXECUTOR, ctx.run, func, *args),
             timeout=timeout,
         )
     except asyncio.TimeoutError:
@@ -140,12 +374,18 @@ async def async_run_with_timeout(func: Callable, args: tuple = (), timeout: int
 _session: Optional[aiohttp.ClientSession] = None
 
 
-# Returns the module-level aiohttp session, creating one if needed.
+# Returns the module-level aiohttp session, creating one if needed. The
+# connector keeps idle connections alive so concurrent tool calls (e.g. a
+# parallel_search batch) reuse TCP/TLS handshakes to the same host.
 async def get_aiohttp_session() -> aiohttp.ClientSession:
     """Returns the shared aiohttp session, creating it if needed."""
     global _session
     if _session is None or _session.closed:
-        _session = aiohttp.ClientSession()
+        connector = aiohttp.TCPConnector(
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        )
+        _session = aiohttp.ClientSession(connector=connector)
     return _session
 
 
@@ -168,7 +408,8 @@ async def safe_execute(func: Callable, *args, default: Any = None, **kwargs) ->
     try:
         return await func(*args, **kwargs)
     except Exception as e:
-        print(f"  ⚠️  {func.__name__} failed: {str(e)[:50]}, using default")
+        if logger.isEnabledFor(logging.WARNING):
+            logger.warning("%s failed: %s, using default", func.__name__, str(e)[:50])
         return default
 
 
@@ -177,10 +418,14 @@ async def safe_execute(func: Callable, *args, default: Any = None, **kwargs) ->
 # ---------------------------------------------------------------------------
 
 class TTLCache:
-    """In-memory cache with per-entry TTL; avoids redundant API calls."""
+    """In-memory cache with per-entry TTL; avoids redundant API calls.
+
+    With *maxsize* set, inserting into a full cache evicts the oldest entry.
+    """
 
-    def __init__(self, ttl: int = 300):
+    def __init__(self, ttl: int = 300, maxsize: Optional[int] = None):
         self.ttl = ttl
+        self.maxsize = maxsize
         self._store: Dict[str, Tuple[float, Any]] = {}
 
     def get(self, key: str) -> Optional[Any]:
@@ -196,6 +441,10 @@ class TTLCache:
 
     def set(self, key: str, value: Any) -> None:
         """Store a value with the current timestamp."""
+        self._store.pop(key, None)
+        if self.maxsize is not None and len(self._store) >= self.maxsize:
+            # Dicts keep insertion order, so the first key is the oldest
+            del self._store[next(iter(self._store))]
         self._store[key] = (time.time(), value)
 
     def clear(self) -> None:
@@ -213,13 +462,16 @@ class TTLCache:
 # Tool-input parsing
 # ---------------------------------------------------------------------------
 
+_RESULT_COUNT_RE = re.compile(r"(\d+)\s+results?:\s*(.+)", re.IGNORECASE)
+
+
 # Takes (query, default, max_allowed). Extracts "N results: query" prefix.
 # Returns (clean_query, clamped_count).
 def parse_result_count(
     query: str, default: int = 5, max_allowed: int = 10,
 ) -> Tuple[str, int]:
     """Extracts 'N results: query' prefix; returns (clean_query, count)."""
-    m = re.match(r"(\d+)\s+results?:\s*(.+)", query, re.IGNORECASE)
+    m = _RESULT_COUNT_RE.match(query)
     if m:
         return m.group(2).strip(), min(int(m.group(1)), max_allowed)
     return query, default
@@ -263,6 +515,19 @@ def safe_tool_call(operation: str):
 # Async HTTP fetch
 # ---------------------------------------------------------------------------
 
+# Takes a JSON str or bytes. Parses with orjson, retrying anything it rejects
+# with json.loads, so the input accepted (and the json.JSONDecodeError raised
+# on bad input) match the stdlib. Returns the parsed value.
+def json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON with orjson, falling back to json.loads for what it rejects."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
 # Takes (url, params, headers, timeout, response_type). GETs a URL via shared session.
 # Returns parsed json, text, or bytes depending on response_type.
 async def async_fetch(
@@ -284,20 +549,45 @@ async def async_fetch(
     ) as resp:
         resp.raise_for_status()
         if response_type == "json":
-            return await resp.json()
+            return await resp.json(loads=json_loads)
         if response_type == "bytes":
             return await resp.read()
         return await resp.text()
 
 
+# Takes (url, params, headers, timeout, chunk_size). GETs a URL via shared session
+# and yields the body in chunks as it arrives. Wrap in contextlib.aclosing() when
+# the caller may stop early, so the connection is released promptly.
+async def async_fetch_chunks(
+    url: str,
+    *,
+    params: Optional[Dict] = None,
+    headers: Optional[Dict] = None,
+    timeout: int = DEFAULT_HTTP_TIMEOUT,
+    chunk_size: int = HTTP_STREAM_CHUNK_SIZE,
+) -> AsyncIterator[bytes]:
+    """GETs a URL via shared aiohttp session; yields the body chunk by chunk."""
+    session = await get_aiohttp_session()
+    hdrs = headers if headers is not None else dict(DEFAULT_HTTP_HEADERS)
+    async with session.get(
+        url,
+        params=params,
+        headers=hdrs,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    ) as resp:
+        resp.raise_for_status()
+        async for chunk in resp.content.iter_chunked(chunk_size):
+            yield chunk
+
+
 # ---------------------------------------------------------------------------
 # Caching decorator for tool functions
 # ---------------------------------------------------------------------------
 
-# Takes (prefix, ttl). Returns a decorator that caches async fn results by args.
-def cached_tool(prefix: str, ttl: int = DEFAULT_CACHE_TTL):
+# Takes (prefix, ttl, maxsize). Returns a decorator that caches async fn results by args.
+def cached_tool(prefix: str, ttl: int = DEFAULT_CACHE_TTL, maxsize: Optional[int] = None):
     """Decorator: caches an async fn's return value by (prefix, *args) key."""
-    _cache = TTLCache(ttl=ttl)
+    _cache = TTLCache(ttl=ttl, maxsize=maxsize)
 
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
@@ -5,6 +5,7 @@ import sys
 import json
 import pytest
 import aiohttp
+from yarl import URL
 from unittest.mock import patch, AsyncMock
 
 # Ensure the project root is on the Python path
@@ -35,6 +36,17 @@ class MockResponse:
             raise HTTPError(f"{self.status_code} Error")
 
 
+class _MockStreamReader:
+    """Stands in for aiohttp's StreamReader (``resp.content``)."""
+
+    def __init__(self, data: bytes):
+        self._data = data
+
+    async def iter_chunked(self, n):
+        for i in range(0, len(self._data), n):
+            yield self._data[i:i + n]
+
+
 class AsyncMockResponse:
     """Reusable mock for aiohttp responses."""
 
@@ -43,10 +55,11 @@ class AsyncMockResponse:
         self._json_data = json_data
         self._text = text
         self.status = status
-        self._content = content
+        self._content = content or text.encode()
         self.headers = headers or {"Content-Type": "text/html"}
+        self.charset = None
 
-    async def json(self):
+    async def json(self, **kwargs):
         if self._json_data is not None:
             return self._json_data
         raise ValueError("No JSON data")
@@ -57,10 +70,16 @@ class AsyncMockResponse:
     async def read(self):
         return self._content
 
+    @property
+    def content(self):
+        return _MockStreamReader(self._content)
+
     def raise_for_status(self):
         if self.status >= 400:
+            url = URL("https://example.test/")
             raise aiohttp.ClientResponseError(
-                None, None, status=self.status, message=f"{self.status} Error"
+                aiohttp.RequestInfo(url, "GET", {}, url), (),
+                status=self.status, message=f"{self.status} Error", headers=self.headers,
             )
 
     async def __aenter__(self):
@@ -83,6 +102,36 @@ def _fast_retries():
         yield
 
 
+@pytest.fixture(autouse=True)
+def _clear_tool_caches():
+    """Tests reuse queries, URLs and locations with different mocks, so
+    every tool's module-level ``_cache`` starts and ends each test empty.
+    Only already-imported tool modules are touched."""
+    from src.utils import TTLCache
+
+    def clear():
+        for name, module in list(sys.modules.items()):
+            if not name.startswith("src.tools."):
+                continue
+            cache = getattr(module, "_cache", None)
+            if isinstance(cache, TTLCache):
+                cache.clear()
+
+    clear()
+    yield
+    clear()
+
+
+@pytest.fixture(autouse=True)
+def _reset_circuit_breakers():
+    """Failure-path tests would otherwise leave a service's breaker open
+    for whichever test calls it next."""
+    from src.utils import _breakers
+    for breaker in _breakers.values():
+        breaker.reset()
+    yield
+
+
 @pytest.fixture
 def mock_response():
     """Factory fixture for creating MockResponse objects."""
@@ -118,11 +167,13 @@ def forecast_api_response():
         "city": {"name": "London", "country": "GB"},
         "list": [
             {
+                "dt": 1774267200,
                 "dt_txt": "2026-03-23 12:00:00",
                 "weather": [{"description": "sunny"}],
                 "main": {"temp": 20, "temp_min": 15, "temp_max": 25},
             },
             {
+                "dt": 1774353600,
                 "dt_txt": "2026-03-24 12:00:00",
                 "weather": [{"description": "cloudy"}],
                 "main": {"temp": 18, "temp_min": 13, "temp_max": 22},
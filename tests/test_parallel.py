@@ -19,6 +19,7 @@ if "wikipedia" not in sys.modules:
 from src.tools.parallel_tool import (
     parallel_search,
     parallel_tool,
+    truncate_result,
     ParallelSearchInput,
     SearchSpec,
 )
@@ -65,6 +66,100 @@ class TestParallelSearch:
             assert "FAILED" in result
             assert "Search failed" in result
 
+    async def test_duplicate_searches_dispatched_once(self):
+        calls = []
+
+        async def mock_web_search(q):
+            calls.append(q)
+            return f"Web: {q}"
+
+        with patch("src.tools.parallel_tool.web_search", side_effect=mock_web_search):
+            searches = [
+                {"type": "web", "query": "same"},
+                {"type": "WEB", "query": "same"},
+                {"type": "web", "query": "other"},
+            ]
+            result = await parallel_search(searches)
+
+            assert sorted(calls) == ["other", "same"]
+            assert "3/3 successful" in result
+            assert result.count("Web: same") == 2
+
+    async def test_repeat_search_served_from_cache(self):
+        calls = []
+
+        async def mock_web_search(q):
+            calls.append(q)
+            return f"Web: {q}"
+
+        with patch("src.tools.parallel_tool.web_search", side_effect=mock_web_search):
+            await parallel_search([{"type": "web", "query": "cached"}])
+            result = await parallel_search([{"type": "web", "query": "cached"}])
+
+            assert calls == ["cached"]
+            assert "Web: cached" in result
+
+    async def test_error_results_not_cached(self):
+        calls = []
+
+        async def mock_web_search(q):
+            calls.append(q)
+            return "Error performing web search: rate limited"
+
+        with patch("src.tools.parallel_tool.web_search", side_effect=mock_web_search):
+            await parallel_search([{"type": "web", "query": "flaky"}])
+            await parallel_search([{"type": "web", "query": "flaky"}])
+
+            assert calls == ["flaky", "flaky"]
+
+    async def test_lookup_failure_reported_not_raised(self):
+        with patch("src.tools.parallel_tool.get_search_function",
+                   side_effect=RuntimeError("lookup broke")):
+            result = await parallel_search([{"type": "web", "query": "test"}])
+
+            assert "0/1 successful" in result
+            assert "lookup broke" in result
+
+    async def test_timeout_keeps_finished_results(self):
+        import asyncio
+
+        async def mock_web_search(q):
+            await asyncio.sleep(5)
+            return "Web: too slow"
+
+        async def mock_wiki_search(q):
+            return "Wiki: fast answer"
+
+        with patch("src.tools.parallel_tool.PARALLEL_TIMEOUT", 0.05), \
+             patch("src.tools.parallel_tool.web_search", side_effect=mock_web_search), \
+             patch("src.tools.parallel_tool.wikipedia", side_effect=mock_wiki_search):
+            searches = [
+                {"type": "web", "query": "slow"},
+                {"type": "wikipedia", "query": "fast"},
+            ]
+            result = await parallel_search(searches)
+
+            assert "1/2 successful" in result
+            assert "Wiki: fast answer" in result
+            assert "timed out" in result
+            assert "too slow" not in result
+
+
+class TestTruncateResult:
+    """Type-specific truncation that prefers sentence/line boundaries."""
+
+    def test_short_result_unchanged(self):
+        assert truncate_result("short", "web") == "short"
+
+    def test_cuts_at_late_sentence_boundary(self):
+        text = "a" * 550 + ". " + "b" * 200
+        assert truncate_result(text, "web") == "a" * 550 + "...."
+
+    def test_hard_cut_when_boundary_too_early(self):
+        text = "a. " + "b" * 1000
+        result = truncate_result(text, "web")
+        assert result == text[:600] + "..."
+
 
 class TestParallelSearchSchema:
     """Pydantic args_schema enforces shape; LangChain rejects bad calls at the boundary."""
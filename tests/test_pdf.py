@@ -1,11 +1,27 @@
 """Tests for src/tools/pdf_tool.py -- PDF document reading."""
 
+import asyncio
 import io
+import os
 import pytest
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from unittest.mock import AsyncMock, MagicMock, patch
 from tests.conftest import AsyncMockResponse
 
 
+@pytest.fixture(autouse=True)
+def _inline_pdf_pool(request):
+    """Run extraction on a thread instead of a spawned process so the
+    pdfplumber mocks patched into this process stay in effect."""
+    if "real_pool" in request.keywords:
+        yield
+        return
+    with ThreadPoolExecutor(max_workers=1) as pool, \
+         patch("src.tools.pdf_tool.get_pdf_pool", return_value=pool):
+        yield
+
+
 class TestPdfReader:
     """Test PDF reading with mocked HTTP and PDF library."""
 
@@ -60,6 +76,69 @@ class TestPdfReader:
 
             assert "Error" in result or "error" in result.lower()
 
+    async def test_fetch_pdf_joins_streamed_chunks(self):
+        pdf_bytes = b"%PDF-1.4 " + b"x" * 200000
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(content=pdf_bytes)
+
+        with patch("src.utils.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session):
+            from src.tools.pdf_tool import fetch_pdf
+            assert await fetch_pdf("https://example.com/big.pdf") == pdf_bytes
+
+    async def test_fetch_pdf_caches_by_url(self):
+        pdf_bytes = b"%PDF-1.4 small"
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(content=pdf_bytes)
+
+        with patch("src.utils.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session):
+            from src.tools.pdf_tool import fetch_pdf
+            await fetch_pdf("https://example.com/cached.pdf")
+            assert await fetch_pdf("https://example.com/cached.pdf") == pdf_bytes
+            assert mock_session.get.call_count == 1
+
+    async def test_fetch_pdf_rejects_non_pdf(self):
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(content=b"<html>not a pdf</html>")
+
+        with patch("src.utils.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session):
+            from src.tools.pdf_tool import pdf_reader
+            result = await pdf_reader("https://example.com/page.pdf")
+
+            assert "does not point to a PDF" in result
+
+    @pytest.mark.real_pool
+    async def test_extraction_runs_in_worker_process(self):
+        pdf_bytes = b"%PDF-1.4 truncated"
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(content=pdf_bytes)
+
+        with patch("src.utils.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session):
+            from src.tools.pdf_tool import pdf_reader
+            result = await pdf_reader("https://example.com/broken.pdf")
+
+            # The worker process parsed (and rejected) the bytes and sent the
+            # error string back, proving the call round-trips through pickling.
+            assert "Error extracting text from PDF" in result
+
+    @pytest.mark.real_pool
+    async def test_broken_pool_is_replaced(self):
+        from src.tools import pdf_tool
+
+        pool = pdf_tool.get_pdf_pool()
+        with pytest.raises(BrokenProcessPool):
+            await asyncio.wrap_future(pool.submit(os._exit, 1))
+
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(content=b"%PDF-1.4 truncated")
+        with patch("src.utils.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session):
+            first = await pdf_tool.pdf_reader("https://example.com/a.pdf")
+            second = await pdf_tool.pdf_reader("https://example.com/b.pdf")
+
+        assert "Error reading PDF" in first
+        assert pdf_tool._pdf_pool is not pool
+        # The next call ran on a fresh pool instead of failing the same way
+        assert "Error extracting text from PDF" in second
+
     def test_extract_text_pdfplumber(self):
         """Test extract_text_from_pdf with pdfplumber."""
         mock_page = MagicMock()
@@ -102,6 +181,30 @@ class TestPdfReader:
             assert "Page 3 content" not in result
             assert "3 more pages not shown" in result
 
+    async def test_pypdf_pages_extracted_in_ranges(self):
+        """Long pypdf documents are split across pool tasks but keep page order."""
+        pdf_bytes = b"%PDF-1.4 long"
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(content=pdf_bytes)
+
+        mock_pages = [MagicMock() for _ in range(20)]
+        for i, page in enumerate(mock_pages):
+            page.extract_text.return_value = f"Text of page {i + 1}."
+        mock_reader = MagicMock()
+        mock_reader.pages = mock_pages
+        mock_reader.metadata = None
+
+        with patch("src.utils.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.pdf_tool.PDF_LIBRARY", "pypdf"), \
+             patch("src.tools.pdf_tool.PdfReader", create=True, return_value=mock_reader) as mock_cls:
+            from src.tools.pdf_tool import pdf_reader
+            result = await pdf_reader("https://example.com/long.pdf")
+
+            # One header parse plus one parse per page range
+            assert mock_cls.call_count == 3
+            positions = [result.index(f"Text of page {i}.") for i in range(1, 21)]
+            assert positions == sorted(positions)
+
     def test_clean_text_truncation(self):
         from src.tools.pdf_tool import clean_text
         long_text = "a" * 20000
@@ -109,6 +212,11 @@ class TestPdfReader:
         assert len(result) < 200
         assert "truncated" in result.lower()
 
+    def test_clean_text_strips_control_chars(self):
+        from src.tools.pdf_tool import clean_text
+        result = clean_text("a\x00b\x0bc\x1fd\te\nf")
+        assert result == "abcd\te\nf"
+
     async def test_help_command(self):
         from src.tools.pdf_tool import pdf_reader
         result = await pdf_reader("help")
@@ -1,7 +1,9 @@
 """Tests for src/tools/python_repl_tool.py — safe Python code execution."""
 
+import sys
 import pytest
-from src.tools.python_repl_tool import execute_python
+from unittest.mock import patch
+from src.tools.python_repl_tool import execute_python, _compile_code
 
 
 class TestBasicExecution:
@@ -49,6 +51,51 @@ class TestErrorHandling:
         assert "Error" in result or "TypeError" in result
 
 
+class TestIsolation:
+    """Test that pooled workers don't leak state between calls."""
+
+    async def test_globals_do_not_leak_between_calls(self):
+        execute_python("global leaked\nleaked = 1")
+        result = execute_python("leaked")
+        assert "NameError" in result
+
+    async def test_output_does_not_carry_over_between_calls(self):
+        # More calls than workers, so each worker's buffers get reused
+        for word in ("first", "second", "third", "fourth"):
+            assert execute_python(f"print('{word}')") == word
+
+    async def test_module_attribute_mutation_does_not_leak(self):
+        execute_python("math.pi = 3")
+        execute_python("del json.dumps")
+        # More calls than workers, so every worker is checked
+        for _ in range(4):
+            assert execute_python("print(math.pi)") == "3.141592653589793"
+            assert execute_python("json.dumps([1])") == "'[1]'"
+
+    async def test_random_seed_does_not_leak(self):
+        seeded = execute_python("random.seed(1)\nprint(random.random())")
+        assert seeded == "0.13436424411240122"
+        for _ in range(4):
+            assert execute_python("random.random()") != seeded
+
+    async def test_class_attribute_mutation_does_not_leak(self):
+        execute_python("json.JSONEncoder.item_separator = ' ; '")
+        for _ in range(4):
+            assert execute_python("json.dumps([1, 2, 3])") == "'[1, 2, 3]'"
+
+    async def test_library_options_do_not_leak(self):
+        pytest.importorskip("numpy")
+        pytest.importorskip("pandas")
+        execute_python("np.set_printoptions(precision=1)\npd.set_option('display.precision', 1)")
+        for _ in range(4):
+            assert execute_python("print(np.get_printoptions()['precision'])") == "8"
+            assert execute_python("print(pd.get_option('display.precision'))") == "6"
+
+    async def test_builtins_mutation_does_not_leak(self):
+        execute_python("__builtins__['len'] = None")
+        assert "3" in execute_python("len([1, 2, 3])")
+
+
 class TestTimeout:
     """Test timeout enforcement."""
 
@@ -56,6 +103,36 @@ class TestTimeout:
         result = execute_python("while True: pass")
         assert "timeout" in result.lower() or "error" in result.lower() or "Error" in result
 
+    async def test_pool_recovers_after_timeout(self):
+        assert "Timeout" in execute_python("while True: pass")
+        assert "2" in execute_python("1 + 1")
+
+    async def test_worker_survives_its_own_timeout(self):
+        assert "Timeout" in execute_python("while True: pass")
+        assert "Timeout" in execute_python("while True: pass")
+        # Both timeouts were raised inside the workers, which stayed alive
+        from src.tools.python_repl_tool import _idle_workers
+        assert all(w is not None and w.process.is_alive() for w in list(_idle_workers.queue))
+
+
+class TestResourceLimits:
+    """Test the rlimits applied to pooled workers."""
+
+    @pytest.mark.skipif(sys.platform != "linux", reason="RLIMIT_AS is only enforced on Linux")
+    async def test_memory_limit_raises_memory_error(self):
+        result = execute_python("x = [0] * (10 ** 9)")
+        assert "MemoryError" in result
+
+    @pytest.mark.skipif(sys.platform != "linux", reason="RLIMIT_CPU is only enforced on Unix")
+    async def test_cpu_limit_kills_worker_and_pool_recovers(self):
+        # Swallows the one-shot timer, then spins; with the parent's wait
+        # stretched, the worker's own CPU rlimit fires first
+        code = "while True:\n    try:\n        for _ in iter(int, 1): pass\n    except:\n        pass"
+        with patch("src.tools.python_repl_tool.EXECUTION_TIMEOUT", 15):
+            result = execute_python(code)
+        assert "WorkerExit" in result
+        assert "2" in execute_python("1 + 1")
+
 
 class TestSafety:
     """Test that dangerous operations are restricted."""
@@ -63,3 +140,59 @@ class TestSafety:
     async def test_empty_input(self):
         result = execute_python("")
         assert "no output" in result.lower() or "Error" in result
+
+    async def test_private_attribute_access_rejected(self):
+        result = execute_python("().__class__.__bases__[0].__subclasses__()")
+        assert "ValueError" in result
+        assert "private attribute" in result
+
+    async def test_generator_frame_escape_rejected(self):
+        code = (
+            "global gen\n"
+            "def g():\n"
+            "    yield gen.gi_frame.f_back.f_back.f_globals\n"
+            "gen = g()\n"
+            "m = next(gen)"
+        )
+        result = execute_python(code)
+        assert "ValueError" in result
+        assert "frame attribute" in result
+
+    @pytest.mark.parametrize("code", [
+        "def g(): yield 1\ng().gi_code",
+        "tb = None\ntb.tb_next.tb_frame",
+        "async def c(): pass\nc().cr_frame.f_locals",
+    ])
+    async def test_frame_attribute_access_rejected(self, code):
+        assert "ValueError" in execute_python(code)
+
+    @pytest.mark.parametrize("code", [
+        '"{0.__class__.__mro__}".format(())',
+        'def f(): pass\n"{0.__globals__}".format(f)',
+        '"{0:{1.__class__}}".format(1, ())',
+        '"{0[__builtins__]}".format_map({})',
+        't = "{0." + "__class__}"\nt.format(())',
+        'str.format("{0.__class__}", ())',
+        'def g(): yield 1\n"{0.gi_frame.f_globals}".format(g())',
+    ])
+    async def test_format_private_field_access_rejected(self, code):
+        assert "ValueError" in execute_python(code)
+
+    async def test_literal_format_allowed(self):
+        assert execute_python('"{:.2f} and {name}".format(3.14159, name="x")') == "'3.14 and x'"
+
+
+class TestCompileCache:
+    """Test the memoized compile step."""
+
+    def test_expression_compiles_in_eval_mode(self):
+        mode, _ = _compile_code("1 + 1")
+        assert mode == "eval"
+
+    def test_statements_compile_in_exec_mode(self):
+        mode, _ = _compile_code("x = 1\nprint(x)")
+        assert mode == "exec"
+
+    def test_repeat_snippet_hits_cache(self):
+        first = _compile_code("2 ** 10")
+        assert _compile_code("2 ** 10") is first
@@ -60,6 +60,19 @@ class TestWebSearch:
             call_kwargs = mock_instance.text.call_args[1]
             assert call_kwargs["region"] == "uk-en"
 
+    async def test_repeat_query_served_from_cache(self, search_results):
+        with patch("src.tools.search_tool.DDGS") as mock_ddgs_cls:
+            mock_instance = MagicMock()
+            mock_instance.text.return_value = search_results
+            mock_ddgs_cls.return_value = mock_instance
+
+            first = await web_search("cached query")
+            second = await web_search("  cached   query ")
+
+            assert mock_instance.text.call_count == 1
+            assert "Test Result 1" in second
+            assert first.count("Test Result") == second.count("Test Result")
+
     async def test_empty_query(self):
         result = await web_search("")
         assert "Error" in result or "No search query" in result
@@ -79,6 +92,28 @@ class TestWebSearch:
 
             assert "..." in result
 
+    async def test_transient_error_retried(self, search_results):
+        with patch("src.tools.search_tool.DDGS") as mock_ddgs_cls:
+            mock_instance = MagicMock()
+            mock_instance.text.side_effect = [TimeoutError("slow"), search_results]
+            mock_ddgs_cls.return_value = mock_instance
+
+            result = await web_search("flaky query")
+
+            assert mock_instance.text.call_count == 2
+            assert "Test Result 1" in result
+
+    async def test_programming_error_not_retried(self):
+        with patch("src.tools.search_tool.DDGS") as mock_ddgs_cls:
+            mock_instance = MagicMock()
+            mock_instance.text.side_effect = KeyError("keywords")
+            mock_ddgs_cls.return_value = mock_instance
+
+            result = await web_search("broken query")
+
+            assert mock_instance.text.call_count == 1
+            assert "Error" in result
+
     async def test_handles_api_error(self):
         with patch("src.tools.search_tool.DDGS") as mock_ddgs_cls:
             mock_instance = MagicMock()
@@ -63,6 +63,10 @@ class TestEdgeCases:
         result = convert("10 foobar to baz")
         assert "Error" in result or "not recognized" in result.lower() or "Unknown" in result
 
+    async def test_mismatched_categories(self):
+        result = convert("5 kg to km")
+        assert "Cannot convert weight (kg) to length (km)" in result
+
     async def test_empty_input(self):
         result = convert("")
         assert "Error" in result or "help" in result.lower() or "Usage" in result
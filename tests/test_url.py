@@ -1,6 +1,8 @@
 """Tests for src/tools/url_tool.py -- web page content extraction."""
 
+import io
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import AsyncMock, MagicMock, patch
 from tests.conftest import AsyncMockResponse
 
@@ -56,10 +58,12 @@ class TestUrlFetch:
 
     async def test_handles_404(self):
         import aiohttp
+        from yarl import URL
+        url = URL("https://example.com/404")
         mock_resp = AsyncMockResponse(text="Not Found", status=404)
         mock_resp.raise_for_status = MagicMock(
             side_effect=aiohttp.ClientResponseError(
-                None, None, status=404, message="Not Found"
+                aiohttp.RequestInfo(url, "GET", {}, url), (), status=404, message="Not Found"
             )
         )
         mock_session = MagicMock()
@@ -98,3 +102,208 @@ class TestUrlFetch:
 
             # Should be truncated, not the full 10000 chars
             assert len(result) < 10000
+
+    async def test_json_returned_without_html_parsing(self):
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(
+            text='{"status": "ok", "items": [1, 2]}',
+            headers={"Content-Type": "application/json; charset=utf-8"},
+        )
+
+        with patch("src.tools.url_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.url_tool.BeautifulSoup") as mock_soup:
+            from src.tools.url_tool import fetch_url
+            result = await fetch_url("https://api.example.com/data")
+
+            assert '{"status": "ok", "items": [1, 2]}' in result
+            mock_soup.assert_not_called()
+
+    async def test_extracts_pdf_pages_on_pool(self):
+        pypdf = pytest.importorskip("pypdf")
+        writer = pypdf.PdfWriter()
+        for _ in range(25):
+            writer.add_blank_page(width=100, height=100)
+        writer.add_metadata({"/Title": "Blank Report"})
+        buf = io.BytesIO()
+        writer.write(buf)
+
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(
+            content=buf.getvalue(), headers={"Content-Type": "application/pdf"},
+        )
+
+        # One thread: PDFium is not thread-safe (the real pool uses processes)
+        with ThreadPoolExecutor(max_workers=1) as pool, \
+             patch("src.tools.url_tool.get_pdf_pool", return_value=pool), \
+             patch("src.tools.url_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session):
+            from src.tools.url_tool import fetch_url
+            result = await fetch_url("https://example.com/report.pdf")
+
+            assert "**Title:** Blank Report" in result
+            assert "**Pages:** 25" in result
+            assert "Showing first 20 of 25 pages" in result
+
+    async def test_html_charset_read_from_meta_tag(self):
+        body = (
+            '<html><head><meta charset="iso-8859-1"><title>Caf\xe9</title></head>'
+            '<body><p>Cr\xe8me br\xfbl\xe9e recipe</p></body></html>'
+        ).encode("latin-1")
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(content=body)
+
+        with patch("src.tools.url_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session):
+            from src.tools.url_tool import fetch_url
+            result = await fetch_url("https://example.com/menu")
+
+            assert "**Title:** Caf\xe9" in result
+            assert "Cr\xe8me br\xfbl\xe9e recipe" in result
+
+    async def test_binary_content_rejected_without_reading_body(self):
+        mock_resp = AsyncMockResponse(content=b"\x89PNG", headers={"Content-Type": "image/png"})
+        mock_session = MagicMock()
+        mock_session.get.return_value = mock_resp
+
+        with patch("src.tools.url_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.url_tool._read_body", new_callable=AsyncMock) as mock_read:
+            from src.tools.url_tool import fetch_url
+            result = await fetch_url("https://example.com/logo.png")
+
+            assert "not a web page (image/png)" in result
+            mock_read.assert_not_called()
+
+    async def test_stops_reading_html_at_byte_cap(self):
+        body = b"<html><body><p>" + b"head " * 40 + b"</p><p>TAIL</p></body></html>"
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(content=body)
+
+        with patch("src.tools.url_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.url_tool.HTML_MAX_BYTES", 100), \
+             patch("src.tools.url_tool.HTTP_STREAM_CHUNK_SIZE", 16):
+            from src.tools.url_tool import fetch_url
+            result = await fetch_url("https://example.com/huge")
+
+            assert "head" in result
+            assert "TAIL" not in result
+
+
+class TestUrlCache:
+    """Extracted pages are cached and revalidated with ETag/Last-Modified."""
+
+    async def test_fresh_page_served_from_cache(self):
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(text=SAMPLE_HTML)
+
+        with patch("src.tools.url_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session):
+            from src.tools.url_tool import fetch_url
+            first = await fetch_url("https://example.com/cached")
+            assert await fetch_url("https://example.com/cached") == first
+            assert mock_session.get.call_count == 1
+
+    async def test_stale_page_revalidated_with_etag(self):
+        from src.tools.url_tool import _cache, fetch_url
+        _cache.set("https://example.com/etag", {
+            "fetched_at": 0,
+            "validators": {"If-None-Match": '"v1"'},
+            "result": "**Title:** Cached copy",
+        })
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(status=304)
+
+        with patch("src.tools.url_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session):
+            result = await fetch_url("https://example.com/etag")
+
+            assert result == "**Title:** Cached copy"
+            sent_headers = mock_session.get.call_args.kwargs["headers"]
+            assert sent_headers["If-None-Match"] == '"v1"'
+
+    async def test_failed_extraction_not_cached(self):
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(text="<html><body></body></html>")
+
+        with patch("src.tools.url_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session):
+            from src.tools.url_tool import fetch_url
+            await fetch_url("https://example.com/empty")
+            await fetch_url("https://example.com/empty")
+            assert mock_session.get.call_count == 2
+
+
+def _text_pdf(texts, title):
+    """Build a small PDF with one line of Helvetica text per page."""
+    pypdf = pytest.importorskip("pypdf")
+    from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+    writer = pypdf.PdfWriter()
+    font = DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    })
+    for text in texts:
+        page = writer.add_blank_page(width=200, height=100)
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 10 50 Td ({text}) Tj ET".encode())
+        page.replace_contents(stream)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+    writer.add_metadata({"/Title": title})
+    buf = io.BytesIO()
+    writer.write(buf)
+    return buf.getvalue()
+
+
+class TestPdfExtraction:
+    """Test PDF text extraction with each available engine."""
+
+    @pytest.mark.parametrize("engine", ["pdfium", "pypdf"])
+    def test_extraction_with_engine(self, engine):
+        from src.tools import url_tool
+        if engine == "pdfium":
+            pytest.importorskip("pypdfium2")
+            pdfium = url_tool.pdfium
+        else:
+            pdfium = None
+
+        content = _text_pdf(["Hello page one", "Second page"], "Engine Report")
+        with patch("src.tools.url_tool.pdfium", pdfium):
+            result = url_tool._extract_pdf_content(content, "https://example.com/r.pdf")
+
+        assert "**Title:** Engine Report" in result
+        assert "**Pages:** 2" in result
+        assert "--- Page 1 ---\nHello page one" in result
+        assert "--- Page 2 ---\nSecond page" in result
+
+
+class TestHtmlExtraction:
+    """_extract_html_content gives the same result with either parser."""
+
+    @pytest.mark.parametrize("parser", ["lxml", "html.parser"])
+    def test_extraction_with_parser(self, parser):
+        pytest.importorskip(parser.split(".")[0])
+        from src.tools.url_tool import _extract_html_content
+        with patch("src.tools.url_tool.HTML_PARSER", parser):
+            result = _extract_html_content(SAMPLE_HTML, "https://example.com")
+
+        assert "**Title:** Test Page" in result
+        assert "**Author:** Test Author" in result
+        assert "main content of the test page" in result
+
+    @pytest.mark.parametrize("parser", ["lxml", "html.parser"])
+    def test_main_content_preferred_over_boilerplate(self, parser):
+        pytest.importorskip(parser.split(".")[0])
+        html = (
+            "<html><head><title>Post</title>"
+            '<meta property="article:published_time" content="2024-05-01T10:00:00Z"></head>'
+            "<body><nav><p>Home | About</p></nav>"
+            '<div class="post body"><p>Article text.</p><script>track()</script></div>'
+            "<p>Sidebar blurb.</p></body></html>"
+        )
+        from src.tools.url_tool import _extract_html_content
+        with patch("src.tools.url_tool.HTML_PARSER", parser):
+            result = _extract_html_content(html, "https://example.com")
+
+        assert "**Date:** 2024-05-01" in result
+        assert "Article text." in result
+        assert "Sidebar" not in result
+        assert "Home" not in result
+        assert "track()" not in result
@@ -1,13 +1,24 @@
-"""Tests for src/utils.py — async retry, timeout, TTLCache, rate limit detection."""
+"""Tests for src/utils.py — async retry, timeout, circuit breaker, TTLCache, rate limit detection."""
 
 import time
 import asyncio
+import aiohttp
 import pytest
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 from src.utils import (
-    async_retry_on_error, async_run_with_timeout,
+    async_retry_on_error, async_run_with_timeout, circuit_breaker, CircuitOpenError, bulkhead,
     safe_execute, TTLCache, _is_rate_limit_error,
+    get_aiohttp_session, close_aiohttp_session,
 )
+from src.constants import HTTP_POOL_LIMIT_PER_HOST
+from yarl import URL
+
+
+def _http_error(status, headers=None):
+    url = URL("https://api.example.test/")
+    return aiohttp.ClientResponseError(
+        aiohttp.RequestInfo(url, "GET", {}, url), (), status=status, headers=headers,
+    )
 
 
 class TestAsyncRetryOnError:
@@ -69,6 +80,168 @@ class TestAsyncRetryOnError:
         assert await add(a=10, b=20) == 30
 
 
+    async def test_retries_logged_not_printed(self, caplog, capsys):
+        @async_retry_on_error(max_retries=1, delay=0)
+        async def always_fails():
+            raise ConnectionError("server down")
+
+        with caplog.at_level("WARNING", logger="src.utils"):
+            with pytest.raises(ConnectionError):
+                await always_fails()
+
+        assert "Retry 1/1 for always_fails after server down" in caplog.text
+        assert "All 1 retries failed for always_fails" in caplog.text
+        assert capsys.readouterr().out == ""
+
+    async def test_client_errors_not_retried(self):
+        calls = 0
+
+        @async_retry_on_error(max_retries=3, delay=0)
+        async def not_found():
+            nonlocal calls
+            calls += 1
+            raise _http_error(404)
+
+        with pytest.raises(aiohttp.ClientResponseError):
+            await not_found()
+        assert calls == 1
+
+    async def test_retry_after_header_overrides_backoff(self):
+        attempts = 0
+
+        @async_retry_on_error(max_retries=1, delay=1.0)
+        async def busy():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise _http_error(503, {"Retry-After": "7"})
+            return "ok"
+
+        with patch("src.utils._retry_sleep", new_callable=AsyncMock) as sleep:
+            assert await busy() == "ok"
+        sleep.assert_awaited_once_with(7.0)
+
+    async def test_jittered_delay_within_bounds(self):
+        @async_retry_on_error(max_retries=3, delay=1.0, backoff=2.0, jitter=0.5, max_delay=3.0)
+        async def always_fails():
+            raise ConnectionError("server down")
+
+        with patch("src.utils._retry_sleep", new_callable=AsyncMock) as sleep:
+            with pytest.raises(ConnectionError):
+                await always_fails()
+        delays = [call.args[0] for call in sleep.await_args_list]
+        assert 0.5 <= delays[0] <= 1.5
+        assert 1.0 <= delays[1] <= 3.0
+        assert delays[2] <= 3.0
+
+
+class TestCircuitBreaker:
+    """Tests for the circuit_breaker decorator."""
+
+    async def test_opens_after_threshold_and_fails_fast(self):
+        calls = 0
+
+        @circuit_breaker("test-open", failure_threshold=2, reset_timeout=60)
+        async def down():
+            nonlocal calls
+            calls += 1
+            raise ConnectionError("server down")
+
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await down()
+        with pytest.raises(CircuitOpenError, match="test-open"):
+            await down()
+        assert calls == 2
+
+    async def test_half_open_probe_closes_on_success(self):
+        healthy = False
+
+        @circuit_breaker("test-probe", failure_threshold=1, reset_timeout=60)
+        async def flaky():
+            if not healthy:
+                raise ConnectionError("server down")
+            return "ok"
+
+        with pytest.raises(ConnectionError):
+            await flaky()
+        with pytest.raises(CircuitOpenError):
+            await flaky()
+
+        healthy = True
+        flaky._breaker.opened_at -= 60
+        assert await flaky() == "ok"
+        assert flaky._breaker.state == flaky._breaker.CLOSED
+
+    async def test_failed_probe_reopens(self):
+        @circuit_breaker("test-reopen", failure_threshold=3, reset_timeout=60)
+        async def down():
+            raise ConnectionError("server down")
+
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await down()
+        down._breaker.opened_at -= 60
+        with pytest.raises(ConnectionError):
+            await down()
+        with pytest.raises(CircuitOpenError):
+            await down()
+
+    async def test_cancelled_probe_releases_half_open(self):
+        mode = "down"
+
+        @circuit_breaker("test-cancel", failure_threshold=1, reset_timeout=60)
+        async def flaky():
+            if mode == "down":
+                raise ConnectionError("server down")
+            if mode == "hang":
+                await asyncio.sleep(10)
+            return "ok"
+
+        with pytest.raises(ConnectionError):
+            await flaky()
+        flaky._breaker.opened_at -= 60
+        mode = "hang"
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(flaky(), timeout=0.01)
+        assert flaky._breaker.state == flaky._breaker.OPEN
+
+        # The abandoned probe doesn't block the next one
+        mode = "up"
+        assert await flaky() == "ok"
+        assert flaky._breaker.state == flaky._breaker.CLOSED
+
+    async def test_client_errors_do_not_trip(self):
+        @circuit_breaker("test-4xx", failure_threshold=1, reset_timeout=60)
+        async def not_found():
+            raise _http_error(404)
+
+        for _ in range(3):
+            with pytest.raises(aiohttp.ClientResponseError):
+                await not_found()
+        assert not_found._breaker.state == not_found._breaker.CLOSED
+
+
+class TestBulkhead:
+    """Tests for the bulkhead decorator."""
+
+    async def test_limits_concurrent_calls(self):
+        running = peak = 0
+
+        @bulkhead(2)
+        async def call():
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return "done"
+
+        results = await asyncio.gather(*(call() for _ in range(6)))
+        assert results == ["done"] * 6
+        assert peak == 2
+
+
 class TestAsyncRunWithTimeout:
     """Tests for async_run_with_timeout."""
 
@@ -89,6 +262,13 @@ class TestAsyncRunWithTimeout:
         result = await async_run_with_timeout(lambda x: x * 2, args=(21,), timeout=5)
         assert result == 42
 
+    async def test_runs_on_shared_pool(self):
+        import threading
+        name = await async_run_with_timeout(
+            lambda: threading.current_thread().name, timeout=5,
+        )
+        assert name.startswith("tool_io")
+
 
 class TestSafeExecute:
     """Tests for the async safe_execute helper."""
@@ -112,6 +292,19 @@ class TestSafeExecute:
         assert result is None
 
 
+class TestSharedSession:
+    """Tests for the shared aiohttp session."""
+
+    async def test_session_reused_with_pooled_connector(self):
+        try:
+            first = await get_aiohttp_session()
+            second = await get_aiohttp_session()
+            assert first is second
+            assert first.connector.limit_per_host == HTTP_POOL_LIMIT_PER_HOST
+        finally:
+            await close_aiohttp_session()
+
+
 class TestTTLCache:
     """Tests for the TTLCache."""
 
@@ -138,6 +331,24 @@ class TestTTLCache:
         assert cache.get("a") is None
         assert cache.get("b") is None
 
+    async def test_maxsize_evicts_oldest(self):
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("c", 3)
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.get("c") == 3
+
+    async def test_maxsize_reset_key_refreshes_position(self):
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.set("a", 10)
+        cache.set("c", 3)
+        assert cache.get("a") == 10
+        assert cache.get("b") is None
+
     async def test_make_key_deterministic(self):
         key1 = TTLCache.make_key("a", "b", "c")
         key2 = TTLCache.make_key("a", "b", "c")
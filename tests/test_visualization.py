@@ -142,6 +142,23 @@ class TestNewChartTypes:
         assert ".png" in result
 
 
+class TestOutputOptions:
+    """Test the dpi and format options."""
+
+    async def test_jpg_at_custom_dpi(self, tmp_path):
+        result = _gen({"chart_type": "bar", "format": "jpeg", "dpi": 60,
+                       "data": {"labels": ["A", "B"], "values": [1, 2]}}, tmp_path)
+        assert ".jpg" in result
+        from PIL import Image
+        (path,) = tmp_path.glob("*.jpg")
+        assert Image.open(path).size[0] < 10 * 60
+
+    async def test_unknown_format(self, tmp_path):
+        result = _gen({"chart_type": "bar", "format": "bmp",
+                       "data": {"labels": ["A"], "values": [1]}}, tmp_path)
+        assert "Unknown format" in result
+
+
 class TestValidation:
     """Test error handling and validation."""
 
@@ -150,6 +167,21 @@ class TestValidation:
         result = generate_chart("not valid json")
         assert "Error" in result
 
+    async def test_nan_values_accepted(self):
+        # json.loads accepts the NaN literal; the fast parser must too
+        from src.tools.visualization_tool import generate_chart
+        result = generate_chart('{"chart_type": "bar", "data": {"labels": ["a", "b"], "values": [1, NaN]}}')
+        assert "Invalid JSON" not in result
+        assert ".png" in result
+
+    async def test_ragged_series_rejected(self):
+        from src.tools.visualization_tool import generate_chart
+        result = generate_chart(json.dumps({"chart_type": "stacked_bar", "data": {
+            "labels": ["Q1", "Q2"],
+            "series": [{"name": "A", "values": [1, 2]}, {"name": "B", "values": [3]}],
+        }}))
+        assert "series 'B' has 1 values but there are 2 labels" in result
+
     async def test_missing_chart_type_defaults_to_bar(self):
         from src.tools.visualization_tool import generate_chart
         result = generate_chart(json.dumps({"data": {"labels": ["A"], "values": [1]}}))
@@ -73,6 +73,32 @@ class TestForecast:
             assert "forecast" in result.lower()
 
 
+    async def test_forecast_noon_conditions_and_daily_range(self):
+        def entry(ts, desc, low=5, high=15):
+            return {"dt": ts, "weather": [{"description": desc}],
+                    "main": {"temp": 10, "temp_min": low, "temp_max": high}}
+
+        data = {
+            "city": {"name": "Oslo", "country": "NO"},
+            "list": [
+                entry(1774224000, "night", low=1),     # 2026-03-23 00:00 UTC
+                entry(1774256400, "morning"),         # 2026-03-23 09:00 UTC
+                entry(1774267200, "midday"),          # 2026-03-23 12:00 UTC
+                entry(1774278000, "evening", high=20), # 2026-03-23 15:00 UTC
+                entry(1774310400, "next night"),      # 2026-03-24 00:00 UTC
+            ],
+        }
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(json_data=data, status=200)
+
+        with patch("src.tools.weather_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.weather_tool.os.getenv", return_value="test_key"):
+            result = await get_weather(location="Oslo", forecast=True)
+
+            assert "2026-03-23: Midday, 1-20\u00b0C (avg 10\u00b0C)" in result
+            assert "2026-03-24: Next night, 5-15\u00b0C" in result
+
+
 class TestWeatherEdgeCases:
     """Test edge cases."""
 
@@ -92,3 +118,34 @@ class TestWeatherEdgeCases:
             result = await get_weather(lat=51.5, lon=-0.1)
 
             assert "London" in result
+
+
+class TestWeatherCache:
+    """Test the short-lived report cache."""
+
+    async def test_repeat_lookup_served_from_cache(self, weather_api_response):
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(json_data=weather_api_response, status=200)
+
+        with patch("src.tools.weather_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.weather_tool.os.getenv", return_value="test_key"):
+            first = await get_weather("London")
+            second = await get_weather(" london ")
+
+            assert first == second
+            assert mock_session.get.call_count == 1
+
+    async def test_units_and_errors_not_shared(self, weather_api_response):
+        mock_session = MagicMock()
+        mock_session.get.side_effect = [
+            AsyncMockResponse(json_data={"message": "city not found"}, status=404),
+            AsyncMockResponse(json_data=weather_api_response, status=200),
+            AsyncMockResponse(json_data=weather_api_response, status=200),
+        ]
+
+        with patch("src.tools.weather_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.weather_tool.os.getenv", return_value="test_key"):
+            assert "city not found" in await get_weather("London")
+            assert "\u00b0C" in await get_weather("London")
+            assert "\u00b0F" in await get_weather("London", units="imperial")
+            assert mock_session.get.call_count == 3
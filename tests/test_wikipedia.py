@@ -23,17 +23,24 @@ import wikipedia as wiki_module
 from src.tools.wikipedia_tool import wikipedia, wikipedia_tool, WikipediaInput
 
 
+def _page(title, summary):
+    """A stand-in for wikipedia.WikipediaPage."""
+    page = MagicMock(title=title, url=f"https://en.wikipedia.org/wiki/{title}")
+    page.summary = summary
+    return page
+
+
 class TestWikipediaSearch:
     """Test Wikipedia search with mocked API."""
 
     async def test_returns_summary(self):
-        wiki_module.summary = MagicMock(return_value="Python is a programming language.")
+        wiki_module.page = MagicMock(return_value=_page("Python", "Python is a programming language."))
         result = await wikipedia("Python programming")
         assert "Python" in result
         assert "programming language" in result
 
     async def test_page_not_found(self):
-        wiki_module.summary = MagicMock(
+        wiki_module.page = MagicMock(
             side_effect=wiki_module.exceptions.PageError("test")
         )
         result = await wikipedia("xyznonexistentpage123")
@@ -43,17 +50,63 @@ class TestWikipediaSearch:
         error = wiki_module.exceptions.DisambiguationError(
             "Python", ["Python (programming)", "Python (snake)"]
         )
-        wiki_module.summary = MagicMock(side_effect=error)
+        wiki_module.page = MagicMock(side_effect=error)
         result = await wikipedia("Python")
         assert len(result) > 0  # Should handle gracefully
 
     async def test_sentences_kwarg(self):
-        wiki_module.summary = MagicMock(return_value="Test summary.")
-        result = await wikipedia("Python", sentences=2)
-        assert "Test summary" in result
-        # Verify sentences was passed through
-        call_kwargs = wiki_module.summary.call_args[1]
-        assert call_kwargs.get("sentences") == 2
+        wiki_module.page = MagicMock(return_value=_page(
+            "Python", "First sentence. Second one!\nThird, new paragraph. Fourth."
+        ))
+        result = await wikipedia("Python", sentences=3)
+        assert "First sentence. Second one!\nThird, new paragraph." in result
+        assert "Fourth" not in result
+
+    async def test_single_page_load_per_article(self):
+        wiki_module.page = MagicMock(return_value=_page("Python", "Python is a language."))
+        wiki_module.summary = MagicMock()
+        await wikipedia("Python")
+        wiki_module.page.assert_called_once()
+        wiki_module.summary.assert_not_called()
+
+
+    async def test_multiple_results_fetched_concurrently_in_order(self):
+        def fake_page(title, auto_suggest=True):
+            if title == "Missing":
+                raise wiki_module.exceptions.PageError(title)
+            return _page(title, f"About {title}. More detail.")
+
+        wiki_module.search = MagicMock(return_value=["Alpha", "Missing", "Gamma"])
+        wiki_module.page = MagicMock(side_effect=fake_page)
+        result = await wikipedia("greek", results=3)
+
+        assert result.index("1. **Alpha**") < result.index("2. **Missing** (page not found)") < result.index("3. **Gamma**")
+        assert "About Gamma. More detail." in result
+
+    async def test_listing_with_failed_entry_not_cached(self):
+        outage = True
+
+        def fake_page(title, auto_suggest=True):
+            if title == "Beta" and outage:
+                raise ConnectionError("connection reset")
+            return _page(title, f"About {title}.")
+
+        wiki_module.search = MagicMock(return_value=["Alpha", "Beta"])
+        wiki_module.page = MagicMock(side_effect=fake_page)
+        first = await wikipedia("letters", results=2)
+        assert "2. **Beta** (error: connection reset)" in first
+
+        outage = False
+        second = await wikipedia("letters", results=2)
+        assert "About Beta." in second
+        assert wiki_module.search.call_count == 2
+
+    async def test_listing_with_all_entries_failed_reports_error(self):
+        wiki_module.search = MagicMock(return_value=["Alpha", "Beta"])
+        wiki_module.page = MagicMock(side_effect=ConnectionError("connection reset"))
+        result = await wikipedia("letters", results=2)
+
+        assert result.startswith("Error searching Wikipedia: connection reset")
 
 
 class TestWikipediaSchema:
@@ -13,7 +13,7 @@ class TestWolframAlpha:
         mock_session = MagicMock()
         mock_session.get.return_value = mock_resp
 
-        with patch("src.utils.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+        with patch("src.tools.wolfram_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
              patch("src.tools.wolfram_tool.WOLFRAM_ALPHA_APP_ID", "test_key"):
             from src.tools.wolfram_tool import wolfram_alpha
             result = await wolfram_alpha("distance from earth to sun")
@@ -35,33 +35,84 @@ class TestWolframAlpha:
         mock_session = MagicMock()
         mock_session.get.return_value = mock_resp
 
-        with patch("src.utils.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+        with patch("src.tools.wolfram_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
              patch("src.tools.wolfram_tool.WOLFRAM_ALPHA_APP_ID", "test_key"):
             from src.tools.wolfram_tool import wolfram_alpha
             result = await wolfram_alpha("asdfghjkl gibberish")
 
             assert "did not understand" in result.lower() or len(result) > 0
 
+    async def test_no_short_answer(self):
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(text="No short answer available\n", status=200)
+
+        with patch("src.tools.wolfram_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.wolfram_tool.WOLFRAM_ALPHA_APP_ID", "test_key"):
+            from src.tools.wolfram_tool import wolfram_alpha
+            result = await wolfram_alpha("history of Rome")
+
+            assert result.startswith("Wolfram Alpha has data on this but no short answer")
+            assert "'history of Rome'" in result
+
     async def test_error_status_code(self):
         mock_resp = AsyncMockResponse(text="Error", status=501)
         mock_session = MagicMock()
         mock_session.get.return_value = mock_resp
 
-        with patch("src.utils.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+        with patch("src.tools.wolfram_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
              patch("src.tools.wolfram_tool.WOLFRAM_ALPHA_APP_ID", "test_key"):
             from src.tools.wolfram_tool import wolfram_alpha
             result = await wolfram_alpha("test")
 
             assert len(result) > 0  # Should return error info, not crash
 
+    async def test_not_understood_501_reply(self):
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(
+            text="Wolfram|Alpha did not understand your input", status=501
+        )
+
+        with patch("src.tools.wolfram_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.wolfram_tool.WOLFRAM_ALPHA_APP_ID", "test_key"):
+            from src.tools.wolfram_tool import wolfram_alpha
+            result = await wolfram_alpha("asdfghjkl gibberish")
+
+            assert result.startswith("Wolfram Alpha couldn't understand: 'asdfghjkl gibberish'")
+            assert mock_session.get.call_count == 1
+
+    async def test_invalid_app_id(self):
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(text="Error 1: Invalid appid", status=403)
+
+        with patch("src.tools.wolfram_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.wolfram_tool.WOLFRAM_ALPHA_APP_ID", "bad_key"):
+            from src.tools.wolfram_tool import wolfram_alpha
+            result = await wolfram_alpha("speed of light")
+
+            assert "app ID" in result
+            assert mock_session.get.call_count == 1
+
     async def test_timeout_handling(self):
         import asyncio
         mock_session = MagicMock()
         mock_session.get.side_effect = asyncio.TimeoutError("timeout")
 
-        with patch("src.utils.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+        with patch("src.tools.wolfram_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
              patch("src.tools.wolfram_tool.WOLFRAM_ALPHA_APP_ID", "test_key"):
             from src.tools.wolfram_tool import wolfram_alpha
             result = await wolfram_alpha("test")
 
             assert "Error" in result or "timeout" in result.lower() or "failed" in result.lower()
+
+    async def test_repeat_query_served_from_cache(self):
+        mock_session = MagicMock()
+        mock_session.get.return_value = AsyncMockResponse(text="299,792,458 m/s", status=200)
+
+        with patch("src.tools.wolfram_tool.get_aiohttp_session", new_callable=AsyncMock, return_value=mock_session), \
+             patch("src.tools.wolfram_tool.WOLFRAM_ALPHA_APP_ID", "test_key"):
+            from src.tools.wolfram_tool import wolfram_alpha
+            first = await wolfram_alpha("speed of light")
+            second = await wolfram_alpha("  Speed of  light ")
+
+            assert first == second == "Wolfram Alpha: 299,792,458 m/s"
+            assert mock_session.get.call_count == 1
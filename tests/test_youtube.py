@@ -33,6 +33,15 @@ YTDLP_RESULT = {
 }
 
 
+@pytest.fixture(autouse=True)
+def _fresh_ydl():
+    """Each test patches yt_dlp.YoutubeDL; drop instances built by earlier tests."""
+    import threading
+    from src.tools import youtube_tool
+    youtube_tool._ydl_local = threading.local()
+    yield
+
+
 class TestYoutubeSearch:
     """Test YouTube search with mocked yt-dlp."""
 
@@ -74,6 +83,34 @@ class TestYoutubeSearch:
 
             assert "Error" in result
 
+    async def test_reuses_youtubedl_between_searches(self):
+        mock_ydl = MagicMock()
+        mock_ydl.extract_info.return_value = YTDLP_RESULT
+
+        with patch("src.tools.youtube_tool.async_run_with_timeout", side_effect=lambda f, **kw: f()):
+            with patch("yt_dlp.YoutubeDL", return_value=mock_ydl) as ydl_class:
+                from src.tools.youtube_tool import youtube_search, _cache
+                _cache.clear()
+                await youtube_search("first query")
+                await youtube_search("second query")
+
+                assert ydl_class.call_count == 1
+                assert mock_ydl.extract_info.call_count == 2
+
+    async def test_query_variants_share_cache(self):
+        mock_ydl = MagicMock()
+        mock_ydl.extract_info.return_value = YTDLP_RESULT
+
+        with patch("src.tools.youtube_tool.async_run_with_timeout", side_effect=lambda f, **kw: f()):
+            with patch("yt_dlp.YoutubeDL", return_value=mock_ydl):
+                from src.tools.youtube_tool import youtube_search, _cache
+                _cache.clear()
+                await youtube_search("python tutorial")
+                result = await youtube_search("  Python   Tutorial ")
+
+                assert mock_ydl.extract_info.call_count == 1
+                assert "Results for 'Python   Tutorial'" in result
+
     async def test_empty_query(self):
         from src.tools.youtube_tool import youtube_search
         result = await youtube_search("")
@@ -92,3 +129,18 @@ class TestYoutubeSearch:
                 result = await youtube_search("3 results: python tutorial")
 
                 assert len(result) > 0
+
+
+class TestFormatResults:
+    """Test result formatting."""
+
+    def test_description_ellipsis_only_when_cut(self):
+        from src.tools.youtube_tool import format_results
+        video = {"title": "T", "channel": "C", "duration": "1:00", "views": "5 views", "url": "u"}
+        result = format_results([
+            {**video, "description": "Short one."},
+            {**video, "description": "x" * 200},
+        ], "q")
+
+        assert "Description: Short one.\n" in result
+        assert f"Description: {'x' * 150}...\n" in result